@@ -19,7 +19,7 @@ from app.database import Base
 # Import all models to ensure they're registered with Base metadata
 from app.models import (
     User, Listing, ListingImage, Favorite, 
-    Plan, Subscription, ContactMessage, SiteSetting
+    Plan, Subscription, ContactMessage, SiteSetting, QuoteRequest, City, ListingSimilar, MediaBlob
 )
 
 # this is the Alembic Config object, which provides
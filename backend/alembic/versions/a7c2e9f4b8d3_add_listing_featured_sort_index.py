@@ -0,0 +1,50 @@
+"""Make listings.is_featured NOT NULL and index sort=featured_first
+
+Revision ID: a7c2e9f4b8d3
+Revises: f3b1d8e5a9c2
+Create Date: 2026-02-02 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c2e9f4b8d3'
+down_revision: Union[str, None] = 'f3b1d8e5a9c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULLs sort first under DESC and break keyset comparisons, so rule them out
+    op.execute("UPDATE listings SET is_featured = false WHERE is_featured IS NULL;")
+    op.alter_column(
+        'listings',
+        'is_featured',
+        existing_type=sa.Boolean(),
+        nullable=False,
+        server_default=sa.false()
+    )
+
+    # (status, is_featured DESC, created_at DESC, id DESC) serves sort=featured_first;
+    # price_desc scans ix_listings_status_price_id backwards
+    op.create_index(
+        'ix_listings_status_featured_created_at_id',
+        'listings',
+        ['status', sa.text('is_featured DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_status_featured_created_at_id', table_name='listings')
+    op.alter_column(
+        'listings',
+        'is_featured',
+        existing_type=sa.Boolean(),
+        nullable=True,
+        server_default=None
+    )
@@ -0,0 +1,32 @@
+"""Add BlurHash and preview placeholders to listing_images and media_blobs
+
+Revision ID: a9d4e2f6b1c7
+Revises: f7b3d9e1c5a4
+Create Date: 2026-02-19 11:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e2f6b1c7'
+down_revision: Union[str, None] = 'f7b3d9e1c5a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listing_images', sa.Column('blurhash', sa.String(length=64), nullable=True))
+    op.add_column('listing_images', sa.Column('preview', sa.Text(), nullable=True))
+    op.add_column('media_blobs', sa.Column('blurhash', sa.String(length=64), nullable=True))
+    op.add_column('media_blobs', sa.Column('preview', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('media_blobs', 'preview')
+    op.drop_column('media_blobs', 'blurhash')
+    op.drop_column('listing_images', 'preview')
+    op.drop_column('listing_images', 'blurhash')
@@ -0,0 +1,27 @@
+"""Add updated_at to listing_images
+
+Revision ID: b3e7f1a9c5d2
+Revises: a9d4e2f6b1c7
+Create Date: 2026-02-23 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7f1a9c5d2'
+down_revision: Union[str, None] = 'a9d4e2f6b1c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listing_images', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE listing_images SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    op.drop_column('listing_images', 'updated_at')
@@ -0,0 +1,39 @@
+"""Add listing_similar table for precomputed similar listings
+
+Revision ID: b8e4f2a6c1d9
+Revises: a7c2e9f4b8d3
+Create Date: 2026-02-09 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4f2a6c1d9'
+down_revision: Union[str, None] = 'a7c2e9f4b8d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('listing_similar',
+    sa.Column('listing_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), nullable=False),
+    sa.Column('similar_listing_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['similar_listing_id'], ['listings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('listing_id', 'rank')
+    )
+    op.create_index(op.f('ix_listing_similar_similar_listing_id'), 'listing_similar', ['similar_listing_id'], unique=False)
+    op.create_index(op.f('ix_listing_similar_computed_at'), 'listing_similar', ['computed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_listing_similar_computed_at'), table_name='listing_similar')
+    op.drop_index(op.f('ix_listing_similar_similar_listing_id'), table_name='listing_similar')
+    op.drop_table('listing_similar')
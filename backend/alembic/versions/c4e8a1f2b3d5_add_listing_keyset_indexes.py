@@ -0,0 +1,40 @@
+"""Add composite indexes for keyset pagination of listings
+
+Revision ID: c4e8a1f2b3d5
+Revises: a1b2c3d4e5f6, add_quote_requests
+Create Date: 2026-01-10 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f2b3d5'
+down_revision: Union[str, Sequence[str], None] = ('a1b2c3d4e5f6', 'add_quote_requests')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (status, created_at DESC, id DESC) serves sort=newest
+    op.create_index(
+        'ix_listings_status_created_at_id',
+        'listings',
+        ['status', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    # (status, price, id) serves sort=price_asc
+    op.create_index(
+        'ix_listings_status_price_id',
+        'listings',
+        ['status', 'price', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_status_price_id', table_name='listings')
+    op.drop_index('ix_listings_status_created_at_id', table_name='listings')
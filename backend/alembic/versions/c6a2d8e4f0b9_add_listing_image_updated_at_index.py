@@ -0,0 +1,25 @@
+"""Index listing_images.updated_at for the image hash index catch-up
+
+Revision ID: c6a2d8e4f0b9
+Revises: b3e7f1a9c5d2
+Create Date: 2026-02-24 09:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a2d8e4f0b9'
+down_revision: Union[str, None] = 'b3e7f1a9c5d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_listing_images_updated_at'), 'listing_images', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_listing_images_updated_at'), table_name='listing_images')
@@ -0,0 +1,40 @@
+"""Add listings.cover_image_url and index listing_images.listing_id
+
+Revision ID: c9d5a3e7b2f4
+Revises: b8e4f2a6c1d9
+Create Date: 2026-02-10 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d5a3e7b2f4'
+down_revision: Union[str, None] = 'b8e4f2a6c1d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listings', sa.Column('cover_image_url', sa.String(), nullable=True))
+    op.create_index(op.f('ix_listing_images_listing_id'), 'listing_images', ['listing_id'], unique=False)
+
+    # Backfill with the first (lowest id) image of every listing
+    op.execute("""
+        UPDATE listings
+        SET cover_image_url = first_images.url
+        FROM (
+            SELECT DISTINCT ON (listing_id) listing_id, url
+            FROM listing_images
+            ORDER BY listing_id, id
+        ) AS first_images
+        WHERE first_images.listing_id = listings.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_listing_images_listing_id'), table_name='listing_images')
+    op.drop_column('listings', 'cover_image_url')
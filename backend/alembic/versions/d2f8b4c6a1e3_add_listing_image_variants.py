@@ -0,0 +1,30 @@
+"""Add listing_images size and variants
+
+Revision ID: d2f8b4c6a1e3
+Revises: c9d5a3e7b2f4
+Create Date: 2026-02-10 15:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8b4c6a1e3'
+down_revision: Union[str, None] = 'c9d5a3e7b2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listing_images', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('listing_images', sa.Column('height', sa.Integer(), nullable=True))
+    op.add_column('listing_images', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('listing_images', 'variants')
+    op.drop_column('listing_images', 'height')
+    op.drop_column('listing_images', 'width')
@@ -0,0 +1,70 @@
+"""Add full-text search vector to listings
+
+Revision ID: d7f3b9a2c6e1
+Revises: c4e8a1f2b3d5
+Create Date: 2026-01-14 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f3b9a2c6e1'
+down_revision: Union[str, None] = 'c4e8a1f2b3d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('simple', kt_normalize_search_text(title)), 'A') || "
+    "setweight(to_tsvector('simple', kt_normalize_search_text(description)), 'B')"
+)
+
+
+def upgrade() -> None:
+    # Mirror of app.core.text.normalize_search_text: lowercase, strip harakat and
+    # tatweel, fold alef/hamza/taa marbuta/alef maqsura variants, drop the "ال" article.
+    # Must be IMMUTABLE to be usable in a generated column.
+    op.execute(r"""
+        CREATE OR REPLACE FUNCTION kt_normalize_search_text(input text)
+        RETURNS text
+        LANGUAGE sql
+        IMMUTABLE PARALLEL SAFE
+        AS $$
+            SELECT btrim(regexp_replace(regexp_replace(
+                translate(
+                    regexp_replace(lower(coalesce(input, '')), '[\u064B-\u065F\u0670\u0640]', '', 'g'),
+                    'أإآٱىةؤئ',
+                    'اااايهوي'
+                ),
+                '(^|\s)ال(?=\S{2,})', '\1', 'g'),
+                '\s+', ' ', 'g'))
+        $$;
+    """)
+
+    op.add_column(
+        'listings',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True
+        )
+    )
+    op.create_index(
+        'ix_listings_search_vector',
+        'listings',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_search_vector', table_name='listings')
+    op.drop_column('listings', 'search_vector')
+    op.execute("DROP FUNCTION IF EXISTS kt_normalize_search_text(text);")
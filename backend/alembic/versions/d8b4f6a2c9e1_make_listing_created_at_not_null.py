@@ -0,0 +1,41 @@
+"""Make listings.created_at NOT NULL with a database default
+
+Revision ID: d8b4f6a2c9e1
+Revises: c6a2d8e4f0b9
+Create Date: 2026-02-26 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b4f6a2c9e1'
+down_revision: Union[str, None] = 'c6a2d8e4f0b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULLs sort first under DESC and break the (created_at, id) keyset comparisons
+    # of ix_listings_status_created_at_id, so rule them out
+    op.execute("UPDATE listings SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL;")
+    op.alter_column(
+        'listings',
+        'created_at',
+        existing_type=sa.DateTime(),
+        nullable=False,
+        server_default=sa.func.now()
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'listings',
+        'created_at',
+        existing_type=sa.DateTime(),
+        nullable=True,
+        server_default=None
+    )
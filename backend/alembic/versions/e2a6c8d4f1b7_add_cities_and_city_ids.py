@@ -0,0 +1,113 @@
+"""Add cities reference table, normalized city ids and trigram indexes
+
+Revision ID: e2a6c8d4f1b7
+Revises: d7f3b9a2c6e1
+Create Date: 2026-01-20 11:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a6c8d4f1b7'
+down_revision: Union[str, None] = 'd7f3b9a2c6e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (id, slug, name_ar, name_en, aliases) - ids must match app.core.cities.DEFAULT_CITIES
+CITIES = [
+    (1, 'riyadh', 'الرياض', 'Riyadh', ['riyad', 'ar riyadh']),
+    (2, 'jeddah', 'جدة', 'Jeddah', ['jiddah', 'jedda', 'jeda']),
+    (3, 'dammam', 'الدمام', 'Dammam', []),
+    (4, 'khobar', 'الخبر', 'Al Khobar', ['khobar', 'alkhobar', 'al-khobar']),
+    (5, 'makkah', 'مكة المكرمة', 'Makkah', ['mecca', 'makkah al mukarramah', 'مكة']),
+    (6, 'madinah', 'المدينة المنورة', 'Madinah', ['medina', 'al madinah', 'المدينة']),
+    (7, 'dhahran', 'الظهران', 'Dhahran', []),
+    (8, 'taif', 'الطائف', 'Taif', ['at taif', 'al taif']),
+    (9, 'tabuk', 'تبوك', 'Tabuk', []),
+    (10, 'abha', 'أبها', 'Abha', []),
+    (11, 'khamis-mushait', 'خميس مشيط', 'Khamis Mushait', ['khamis mushayt']),
+    (12, 'buraydah', 'بريدة', 'Buraydah', ['buraidah', 'buraida']),
+    (13, 'hail', 'حائل', 'Hail', ["ha'il"]),
+    (14, 'jazan', 'جازان', 'Jazan', ['jizan', 'gizan', 'جيزان']),
+    (15, 'najran', 'نجران', 'Najran', []),
+    (16, 'al-ahsa', 'الأحساء', 'Al Ahsa', ['ahsa', 'hofuf', 'al hofuf', 'الهفوف']),
+    (17, 'jubail', 'الجبيل', 'Jubail', ['al jubail']),
+    (18, 'yanbu', 'ينبع', 'Yanbu', []),
+    (19, 'qatif', 'القطيف', 'Qatif', ['al qatif']),
+    (20, 'al-kharj', 'الخرج', 'Al Kharj', ['kharj']),
+]
+
+
+def upgrade() -> None:
+    cities = op.create_table('cities',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('slug', sa.String(length=50), nullable=False),
+    sa.Column('name_ar', sa.String(length=100), nullable=False),
+    sa.Column('name_en', sa.String(length=100), nullable=False),
+    sa.Column('aliases', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cities_id'), 'cities', ['id'], unique=False)
+    op.create_index(op.f('ix_cities_slug'), 'cities', ['slug'], unique=True)
+
+    op.bulk_insert(cities, [
+        {"id": id_, "slug": slug, "name_ar": name_ar, "name_en": name_en, "aliases": aliases, "is_active": True}
+        for id_, slug, name_ar, name_en, aliases in CITIES
+    ])
+    op.execute("SELECT setval(pg_get_serial_sequence('cities', 'id'), (SELECT MAX(id) FROM cities))")
+
+    # Normalized city references
+    op.add_column('listings', sa.Column('city_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_listings_city_id'), 'listings', ['city_id'], unique=False)
+    op.create_foreign_key('fk_listings_city_id', 'listings', 'cities', ['city_id'], ['id'])
+
+    op.add_column('quote_requests', sa.Column('city_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_quote_requests_city_id'), 'quote_requests', ['city_id'], unique=False)
+    op.create_foreign_key('fk_quote_requests_city_id', 'quote_requests', 'cities', ['city_id'], ['id'])
+
+    # Backfill using the same normalization as the application (kt_normalize_search_text)
+    for table in ('listings', 'quote_requests'):
+        op.execute(f"""
+            UPDATE {table} t
+            SET city_id = c.id
+            FROM cities c
+            WHERE kt_normalize_search_text(replace(t.city, '-', ' ')) IN (
+                kt_normalize_search_text(replace(c.slug, '-', ' ')),
+                kt_normalize_search_text(c.name_ar),
+                kt_normalize_search_text(c.name_en)
+            )
+            OR EXISTS (
+                SELECT 1 FROM json_array_elements_text(c.aliases) AS alias
+                WHERE kt_normalize_search_text(replace(alias, '-', ' ')) = kt_normalize_search_text(replace(t.city, '-', ' '))
+            )
+        """)
+
+    # Trigram index for free-text city filters that do not resolve to a canonical city
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_listings_city_trgm',
+        'listings',
+        ['city'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'city': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_city_trgm', table_name='listings')
+    op.drop_constraint('fk_quote_requests_city_id', 'quote_requests', type_='foreignkey')
+    op.drop_index(op.f('ix_quote_requests_city_id'), table_name='quote_requests')
+    op.drop_column('quote_requests', 'city_id')
+    op.drop_constraint('fk_listings_city_id', 'listings', type_='foreignkey')
+    op.drop_index(op.f('ix_listings_city_id'), table_name='listings')
+    op.drop_column('listings', 'city_id')
+    op.drop_index(op.f('ix_cities_slug'), table_name='cities')
+    op.drop_index(op.f('ix_cities_id'), table_name='cities')
+    op.drop_table('cities')
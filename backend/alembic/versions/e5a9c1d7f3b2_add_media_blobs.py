@@ -0,0 +1,44 @@
+"""Add media_blobs for content-addressed image storage
+
+Revision ID: e5a9c1d7f3b2
+Revises: d2f8b4c6a1e3
+Create Date: 2026-02-11 11:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9c1d7f3b2'
+down_revision: Union[str, None] = 'd2f8b4c6a1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('media_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('variants', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.add_column('listing_images', sa.Column('blob_sha256', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_listing_images_blob_sha256'), 'listing_images', ['blob_sha256'], unique=False)
+    op.create_foreign_key(
+        'fk_listing_images_blob_sha256', 'listing_images', 'media_blobs', ['blob_sha256'], ['sha256']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_listing_images_blob_sha256', 'listing_images', type_='foreignkey')
+    op.drop_index(op.f('ix_listing_images_blob_sha256'), table_name='listing_images')
+    op.drop_column('listing_images', 'blob_sha256')
+    op.drop_table('media_blobs')
@@ -0,0 +1,40 @@
+"""Add listing coordinates and earthdistance index
+
+Revision ID: f3b1d8e5a9c2
+Revises: e2a6c8d4f1b7
+Create Date: 2026-01-27 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b1d8e5a9c2'
+down_revision: Union[str, None] = 'e2a6c8d4f1b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # earthdistance depends on cube; both ship with the standard contrib package
+    op.execute("CREATE EXTENSION IF NOT EXISTS cube;")
+    op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance;")
+
+    op.add_column('listings', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('listings', sa.Column('longitude', sa.Float(), nullable=True))
+
+    # Partial: listings without coordinates never match a near= search
+    op.execute("""
+        CREATE INDEX ix_listings_earth_point ON listings
+        USING gist (ll_to_earth(latitude, longitude))
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_earth_point', table_name='listings')
+    op.drop_column('listings', 'longitude')
+    op.drop_column('listings', 'latitude')
@@ -0,0 +1,28 @@
+"""Add perceptual hashes to listing_images and media_blobs
+
+Revision ID: f7b3d9e1c5a4
+Revises: e5a9c1d7f3b2
+Create Date: 2026-02-12 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b3d9e1c5a4'
+down_revision: Union[str, None] = 'e5a9c1d7f3b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listing_images', sa.Column('dhash', sa.BigInteger(), nullable=True))
+    op.add_column('media_blobs', sa.Column('dhash', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('media_blobs', 'dhash')
+    op.drop_column('listing_images', 'dhash')
@@ -0,0 +1,366 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Optional
+import redis
+from app.core.config import settings
+
+logger = logging.getLogger("kitchentech")
+
+
+class MemoryCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL.
+
+    Entries are evicted when they expire (checked lazily on read) or when the
+    cache grows past max_entries (least recently used first).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Values of the keys that are cached; missing keys are left out."""
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set_many(self, values: Dict[Hashable, Any]) -> None:
+        for key, value in values.items():
+            self.set(key, value)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class RedisCache:
+    """
+    Shared cache backend for any Redis-compatible server (Redis, Valkey, KeyDB, ...).
+
+    Stores bytes only. Connection errors are logged and treated as misses so an
+    unavailable cache never fails a request.
+    """
+
+    def __init__(self, url: str, prefix: str, ttl: float = 60.0):
+        self._client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        try:
+            value = self._client.get(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️  Shared cache get failed: {e}")
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, bytes]:
+        """One MGET for all keys; missing keys are left out."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            values = self._client.mget([self._key(key) for key in keys])
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️  Shared cache get failed: {e}")
+            return {}
+        found = {key: value for key, value in zip(keys, values) if value is not None}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key: Hashable, value: bytes, ttl: Optional[float] = None) -> None:
+        try:
+            self._client.set(self._key(key), value, ex=max(1, int(self.ttl if ttl is None else ttl)))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️  Shared cache set failed: {e}")
+
+    def set_many(self, values: Dict[Hashable, bytes]) -> None:
+        """All writes in one pipelined round trip."""
+        if not values:
+            return
+        try:
+            pipeline = self._client.pipeline(transaction=False)
+            for key, value in values.items():
+                pipeline.set(self._key(key), value, ex=max(1, int(self.ttl)))
+            pipeline.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️  Shared cache set failed: {e}")
+
+    def delete(self, key: Hashable) -> None:
+        try:
+            self._client.delete(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️  Shared cache delete failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class TieredCache:
+    """
+    Read-through pair of an in-process LRU and an optional shared backend.
+
+    Reads try the local cache first, then the shared one (filling the local cache
+    on a shared hit). Writes and deletes go to both. The local TTL should be
+    short, since a delete only reaches the local cache of the worker that issued
+    it.
+    """
+
+    def __init__(self, local: MemoryCache, shared: Optional[RedisCache] = None):
+        self.local = local
+        self.shared = shared
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        keys = list(keys)
+        values = self.local.get_many(keys)
+        if self.shared is not None and len(values) < len(keys):
+            shared_values = self.shared.get_many([key for key in keys if key not in values])
+            self.local.set_many(shared_values)
+            values.update(shared_values)
+        return values
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value)
+
+    def set_many(self, values: Dict[Hashable, Any]) -> None:
+        self.local.set_many(values)
+        if self.shared is not None:
+            self.shared.set_many(values)
+
+    def delete(self, key: Hashable) -> None:
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"local": self.local.stats()}
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
+
+
+class DiskLRUCache:
+    """
+    Files in a directory, capped at max_bytes in total, least recently used evicted first.
+
+    Callers write the file for a key at path_for(key) (atomically, e.g. temp file +
+    rename) and then call add(key). The recency index lives in memory and is rebuilt
+    from file access times on start (a hit sets the atime explicitly and leaves the
+    mtime, which validators are derived from, alone); files added by other processes
+    sharing the directory are adopted on first lookup, so the cap is approximate
+    across processes. All methods do blocking file I/O; async callers run them
+    through run_io.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size in bytes
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        files = []
+        for path in self.directory.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file() and not path.name.startswith("."):
+                files.append((stat.st_atime, path.name, stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        with self._lock:
+            known = key in self._entries
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            if known:
+                self._forget(key)
+            self.misses += 1
+            return None
+        if not known:
+            self.add(key)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))  # Keeps the order across restarts
+        self.hits += 1
+        return path
+
+    def add(self, key: str) -> None:
+        size = self.path_for(key).stat().st_size
+        with self._lock:
+            self._total_bytes += size - self._entries.get(key, 0)
+            self._entries[key] = size
+            self._entries.move_to_end(key)
+        self._evict()
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+
+    def _evict(self) -> None:
+        while True:
+            with self._lock:
+                if self._total_bytes <= self.max_bytes or not self._entries:
+                    return
+                key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                self.evictions += 1
+            self.path_for(key).unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "disk",
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# Named caches, reported by the admin cache stats endpoint
+_caches: Dict[str, Any] = {}
+
+
+def register_cache(name: str, cache: Any) -> Any:
+    _caches[name] = cache
+    return cache
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def create_tiered_cache(name: str, ttl: float, max_entries: int) -> TieredCache:
+    """
+    Build a TieredCache, adding the shared backend when CACHE_URL is configured.
+
+    The local TTL is capped at CACHE_LOCAL_TTL_SECONDS either way: a delete only
+    reaches the worker that issued it, so the other workers' copies must expire
+    soon. Without a shared backend this bounds how long they serve stale data.
+    """
+    shared = None
+    local_ttl = min(ttl, settings.CACHE_LOCAL_TTL_SECONDS)
+    if settings.CACHE_URL:
+        shared = RedisCache(settings.CACHE_URL, prefix=f"kt:{name}", ttl=ttl)
+    return register_cache(name, TieredCache(MemoryCache(max_entries=max_entries, ttl=local_ttl), shared))
+
+
+# ============================================================================
+# Listing detail cache
+# ============================================================================
+
+# Serialized ListingResponse JSON (bytes) of approved listings, keyed by id
+listing_cache = create_tiered_cache(
+    "listing",
+    ttl=settings.LISTING_CACHE_TTL_SECONDS,
+    max_entries=settings.LISTING_CACHE_MAX_ENTRIES
+)
+
+
+def invalidate_listing(listing_id: int) -> None:
+    """Drop the cached detail payload of a listing. Call after every write to it."""
+    listing_cache.delete(listing_id)
@@ -0,0 +1,123 @@
+import logging
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.text import normalize_search_text
+
+logger = logging.getLogger("kitchentech")
+
+
+class CityEntry(NamedTuple):
+    id: int
+    slug: str
+    name_ar: str
+    name_en: str
+    aliases: Tuple[str, ...] = ()
+
+
+# Built-in copy of the rows seeded into the cities table. Ids match the seed
+# migration so the index is usable before (or without) loading from the database.
+DEFAULT_CITIES = [
+    CityEntry(1, "riyadh", "الرياض", "Riyadh", ("riyad", "ar riyadh")),
+    CityEntry(2, "jeddah", "جدة", "Jeddah", ("jiddah", "jedda", "jeda")),
+    CityEntry(3, "dammam", "الدمام", "Dammam", ()),
+    CityEntry(4, "khobar", "الخبر", "Al Khobar", ("khobar", "alkhobar", "al-khobar")),
+    CityEntry(5, "makkah", "مكة المكرمة", "Makkah", ("mecca", "makkah al mukarramah", "مكة")),
+    CityEntry(6, "madinah", "المدينة المنورة", "Madinah", ("medina", "al madinah", "المدينة")),
+    CityEntry(7, "dhahran", "الظهران", "Dhahran", ()),
+    CityEntry(8, "taif", "الطائف", "Taif", ("at taif", "al taif")),
+    CityEntry(9, "tabuk", "تبوك", "Tabuk", ()),
+    CityEntry(10, "abha", "أبها", "Abha", ()),
+    CityEntry(11, "khamis-mushait", "خميس مشيط", "Khamis Mushait", ("khamis mushayt",)),
+    CityEntry(12, "buraydah", "بريدة", "Buraydah", ("buraidah", "buraida")),
+    CityEntry(13, "hail", "حائل", "Hail", ("ha'il",)),
+    CityEntry(14, "jazan", "جازان", "Jazan", ("jizan", "gizan", "جيزان")),
+    CityEntry(15, "najran", "نجران", "Najran", ()),
+    CityEntry(16, "al-ahsa", "الأحساء", "Al Ahsa", ("ahsa", "hofuf", "al hofuf", "الهفوف")),
+    CityEntry(17, "jubail", "الجبيل", "Jubail", ("al jubail",)),
+    CityEntry(18, "yanbu", "ينبع", "Yanbu", ()),
+    CityEntry(19, "qatif", "القطيف", "Qatif", ("al qatif",)),
+    CityEntry(20, "al-kharj", "الخرج", "Al Kharj", ("kharj",)),
+]
+
+
+class CityIndex:
+    """
+    In-memory dictionary of canonical cities.
+
+    Exact lookups (name, slug or alias -> city id) go through a dict; autocomplete
+    uses a sorted key array searched with bisect, which behaves like a prefix trie
+    with much less memory. Keys are normalized with normalize_search_text so Arabic
+    spelling variants and the "ال" article do not matter. Every word start of a
+    name is indexed, so "مشيط" completes "خميس مشيط".
+    """
+
+    def __init__(self, cities: Iterable[CityEntry] = ()):
+        self._build(list(cities))
+
+    def _build(self, cities: List[CityEntry]) -> None:
+        by_id: Dict[int, CityEntry] = {}
+        exact: Dict[str, int] = {}
+        prefix_keys = set()
+
+        for city in cities:
+            by_id[city.id] = city
+            for name in (city.slug, city.name_ar, city.name_en, *city.aliases):
+                key = normalize_search_text(name.replace("-", " "))
+                if not key:
+                    continue
+                exact.setdefault(key, city.id)
+                words = key.split(" ")
+                for start in range(len(words)):
+                    prefix_keys.add((" ".join(words[start:]), city.id))
+
+        keys = sorted(prefix_keys)
+        # Swapped in a single assignment so concurrent readers never see a mix
+        self._state = (by_id, exact, [key for key, _ in keys], [city_id for _, city_id in keys])
+
+    def load(self, db: Session) -> None:
+        """Rebuild the index from the cities table."""
+        from app.models.city import City
+
+        rows = db.query(City).filter(City.is_active == True).all()
+        self._build([
+            CityEntry(row.id, row.slug, row.name_ar, row.name_en, tuple(row.aliases or ()))
+            for row in rows
+        ])
+        logger.info(f"🏙️ City index loaded: {len(rows)} cities")
+
+    def get(self, city_id: int) -> Optional[CityEntry]:
+        return self._state[0].get(city_id)
+
+    def resolve(self, text: Optional[str]) -> Optional[int]:
+        """Return the canonical city id for a name, slug or alias, or None if unknown."""
+        if not text:
+            return None
+        return self._state[1].get(normalize_search_text(text.replace("-", " ")))
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[CityEntry]:
+        """Return up to `limit` cities having a name word starting with `prefix`."""
+        key = normalize_search_text(prefix)
+        if not key:
+            return []
+
+        # A partially typed "الخ" has not been stripped of its article yet
+        prefixes = [key]
+        if key.startswith("ال") and len(key) > 2:
+            prefixes.append(key[2:])
+
+        by_id, _, keys, key_ids = self._state
+        results: List[CityEntry] = []
+        seen = set()
+        for prefix_key in prefixes:
+            position = bisect_left(keys, prefix_key)
+            while position < len(keys) and keys[position].startswith(prefix_key) and len(results) < limit:
+                city_id = key_ids[position]
+                if city_id not in seen:
+                    seen.add(city_id)
+                    results.append(by_id[city_id])
+                position += 1
+        return results
+
+
+city_index = CityIndex(DEFAULT_CITIES)
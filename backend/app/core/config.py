@@ -29,6 +29,38 @@ class Settings(BaseSettings):
     
     # AI
     OPENAI_API_KEY: Optional[str] = None
+    PRICE_COMPARABLES_REFRESH_SECONDS: int = 900
+    
+    # Caching
+    CACHE_URL: Optional[str] = None  # Shared Redis-compatible cache, e.g. redis://127.0.0.1:6379/0
+    CACHE_LOCAL_TTL_SECONDS: int = 5  # In-process TTL; other workers may serve data this stale
+    LISTING_CACHE_TTL_SECONDS: int = 300
+    LISTING_CACHE_MAX_ENTRIES: int = 10000
+    FACETS_CACHE_TTL_SECONDS: int = 60
+    LISTING_COUNT_CACHE_TTL_SECONDS: int = 60
+    LISTING_COUNT_EXACT_THRESHOLD: int = 10000  # Above this planner estimate, X-Total-Count is an estimate
+    
+    # Bulk import
+    BULK_IMPORT_MAX_ROWS: int = 20000
+    
+    # Media
+    STORAGE_BACKEND: str = "local"  # local or s3
+    MEDIA_ROOT: str = "media"  # Local backend directory; with s3 only scratch space for uploads being processed
+    MEDIA_URL: str = "/media"  # Public URL prefix of stored files, e.g. a CDN in front of the bucket
+    S3_BUCKET: Optional[str] = None
+    S3_ENDPOINT_URL: Optional[str] = None  # S3-compatible service, e.g. http://127.0.0.1:9000 (MinIO); unset for AWS
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    IMAGE_WORKERS: int = 2  # Processes generating image derivatives
+    UPLOAD_IO_THREADS: int = 8  # Threads writing uploaded files to disk, shared by all requests
+    UPLOAD_CONCURRENCY: int = 4  # Files of one upload request saved and processed at a time
+    MEDIA_RESIZE_CACHE_DIR: str = "cache/resize"  # On-demand resizes, outside the public media directory
+    MEDIA_RESIZE_CACHE_MAX_MB: int = 1024
+    MEDIA_ACCEL_REDIRECT_PREFIX: Optional[str] = None  # e.g. /_internal; nginx then sends media files (X-Accel-Redirect)
+    
+    # Serialization
+    FAST_JSON_ENABLED: bool = False  # Serialize list endpoints from row tuples with orjson
     
     class Config:
         env_file = ".env"
@@ -57,6 +89,11 @@ class Settings(BaseSettings):
         if not self.DATABASE_URL:
             errors.append("❌ KT_DATABASE_URL is not set")
         
+        if self.STORAGE_BACKEND not in ("local", "s3"):
+            errors.append("❌ STORAGE_BACKEND must be 'local' or 's3'")
+        elif self.STORAGE_BACKEND == "s3" and not self.S3_BUCKET:
+            errors.append("❌ S3_BUCKET must be set when STORAGE_BACKEND is 's3'")
+        
         if self.APP_ENV.lower() == "prod":
             if "sqlite" in self.DATABASE_URL.lower():
                 errors.append("❌ SQLite is not allowed in production. Use PostgreSQL.")
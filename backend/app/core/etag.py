@@ -0,0 +1,52 @@
+import hashlib
+from typing import Any, Dict, Optional
+from fastapi import Request, Response, status
+
+# Clients must revalidate before reuse, which is cheap thanks to If-None-Match
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag derived from version values (ids, timestamps, counts)."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def payload_etag(payload: bytes) -> str:
+    """Strong ETag derived from the response body itself."""
+    return f'"{hashlib.sha1(payload).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers `etag` (weak comparison, RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL, **(headers or {})}
+    )
+
+
+def json_response_with_etag(
+    request: Request,
+    payload: bytes,
+    etag: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Return `payload` as JSON with an ETag, or 304 if the client already has it."""
+    etag = etag or payload_etag(payload)
+    if etag_matches(request, etag):
+        return not_modified(etag, headers)
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL, **(headers or {})}
+    )
@@ -0,0 +1,188 @@
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from stat import S_ISREG
+from typing import Dict, Optional, Tuple, Union
+import anyio
+from fastapi import HTTPException, Request, Response, status
+from starlette.types import Receive, Scope, Send
+from app.core.config import settings
+from app.core.etag import make_etag, etag_matches
+from app.core.uploads import run_io
+
+# For files whose URL changes whenever their content does (uploads, resizes)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Bytes read per chunk when the server can't send the file itself
+FILE_CHUNK_SIZE = 256 * 1024
+
+# A Range header that can't be served from the file
+_UNSATISFIABLE = "unsatisfiable"
+
+
+def _parse_range(header: str, size: int) -> Union[Tuple[int, int], str, None]:
+    """
+    Inclusive (start, end) of a single `bytes=` range, _UNSATISFIABLE, or None to
+    ignore the header and send the whole file (malformed, other units, or
+    several ranges, which RFC 9110 allows a server to ignore).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else None
+        else:
+            suffix = int(last)
+            if suffix == 0:
+                return _UNSATISFIABLE
+            start, end = max(0, size - suffix), None
+    except ValueError:
+        return None
+    if start < 0 or (end is not None and end < start):
+        return None
+    if start >= size:
+        return _UNSATISFIABLE
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def _http_date_timestamp(value: str) -> Optional[int]:
+    try:
+        return int(parsedate_to_datetime(value).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+def _not_modified_since(request: Request, modified: int) -> bool:
+    """If-Modified-Since check; only consulted without If-None-Match (RFC 9110)."""
+    if "if-none-match" in request.headers:
+        return False
+    since = _http_date_timestamp(request.headers.get("if-modified-since", ""))
+    return since is not None and modified <= since
+
+
+def _if_range_matches(request: Request, etag: str, modified: int) -> bool:
+    """True unless an If-Range validator says the client's partial copy is stale."""
+    validator = request.headers.get("if-range")
+    if validator is None:
+        return True
+    validator = validator.strip()
+    if validator.startswith(('"', "W/")):
+        return validator == etag  # Strong comparison; a weak tag never matches
+    return _http_date_timestamp(validator) == modified
+
+
+class FileRangeResponse(Response):
+    """
+    Bytes start..end (inclusive) of a file.
+
+    Uses the ASGI zero-copy extension (sendfile) when the server offers it, and
+    otherwise streams the range in FILE_CHUNK_SIZE reads off the event loop.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        start: int,
+        end: int,
+        status_code: int,
+        headers: Dict[str, str],
+        media_type: str,
+        send_body: bool = True
+    ):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.count = end - start + 1
+        self.send_body = send_body
+        self.headers["content-length"] = str(self.count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.count == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if "http.response.zerocopy" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopy", "file": file, "offset": self.start, "count": self.count
+                })
+            return
+
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.start)
+            remaining = self.count
+            while remaining:
+                chunk = await file.read(min(FILE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining:
+                await send({"type": "http.response.body", "body": b""})
+
+
+def accel_redirect_path(path: Path) -> str:
+    """Internal nginx URI of a file under the working directory, for X-Accel-Redirect."""
+    relative = Path(os.path.relpath(path)).as_posix()
+    return f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{relative}"
+
+
+async def serve_file(
+    request: Request,
+    path: Path,
+    cache_control: str = IMMUTABLE_CACHE_CONTROL,
+    media_type: Optional[str] = None
+) -> Response:
+    """
+    Response for a file that is never modified in place.
+
+    Sends a strong ETag and Last-Modified, answers If-None-Match and
+    If-Modified-Since with 304, and a single byte Range (honouring If-Range)
+    with 206, or 416 if it lies past the end. With MEDIA_ACCEL_REDIRECT_PREFIX
+    set, the body is left to nginx through X-Accel-Redirect, which also handles
+    ranges there, so no API worker time goes into sending bytes. 404 if `path` is
+    not a regular file.
+    """
+    try:
+        stat = await run_io(path.stat)
+    except OSError:
+        stat = None
+    if stat is None or not S_ISREG(stat.st_mode):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    modified = int(stat.st_mtime)
+    etag = make_etag("file", path.as_posix(), stat.st_size, stat.st_mtime_ns)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(modified, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if etag_matches(request, etag) or _not_modified_since(request, modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = media_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        return Response(media_type=media_type, headers={**headers, "X-Accel-Redirect": accel_redirect_path(path)})
+
+    size = stat.st_size
+    send_body = request.method != "HEAD"
+    byte_range = None
+    if "range" in request.headers and _if_range_matches(request, etag, modified):
+        byte_range = _parse_range(request.headers["range"], size)
+    if byte_range == _UNSATISFIABLE:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"}
+        )
+    if byte_range is not None:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return FileRangeResponse(path, start, end, status.HTTP_206_PARTIAL_CONTENT, headers, media_type, send_body)
+    return FileRangeResponse(path, 0, size - 1, status.HTTP_200_OK, headers, media_type, send_body)
@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Encode the sort keys of the last row of a page into an opaque cursor token."""
+    payload = {
+        "s": sort,
+        "k": [value.isoformat() if isinstance(value, datetime) else value for value in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort: str, parsers: Sequence[Callable[[Any], Any]]) -> list:
+    """
+    Decode a cursor token produced by encode_cursor.
+
+    Raises ValueError if the token is malformed or was issued for another sort order.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        keys = payload["k"]
+        issued_for = payload["s"]
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Malformed cursor") from exc
+
+    if issued_for != sort:
+        raise ValueError(f"Cursor was issued for sort '{issued_for}', not '{sort}'")
+
+    if not isinstance(keys, list) or len(keys) != len(parsers):
+        raise ValueError("Malformed cursor")
+
+    try:
+        return [parse(value) for parse, value in zip(parsers, keys)]
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Malformed cursor") from exc
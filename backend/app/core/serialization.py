@@ -0,0 +1,51 @@
+from typing import Any, Iterable, List, Sequence, Type, Union, get_args, get_origin
+import orjson
+from pydantic import BaseModel
+from app.core.config import settings
+
+
+def fast_json_enabled() -> bool:
+    return settings.FAST_JSON_ENABLED
+
+
+def _is_float(annotation: Any) -> bool:
+    if annotation is float:
+        return True
+    return get_origin(annotation) is Union and float in get_args(annotation)
+
+
+class RowSerializer:
+    """
+    Serialize row tuples to the same JSON a pydantic response model would produce.
+
+    Rows must hold one value per model field, in field order (see `columns`). Values
+    are not validated, which is the point: the database already guarantees the types.
+    The only coercion applied is int -> float for float fields, so `5` renders as `5.0`
+    exactly like pydantic does.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.fields = list(model.model_fields)
+        self._float_indexes = [
+            index for index, field in enumerate(model.model_fields.values()) if _is_float(field.annotation)
+        ]
+
+    def columns(self, entity: Any, **overrides: Any) -> List[Any]:
+        """Column expressions of `entity` matching the model fields; `overrides` replace missing ones."""
+        return [overrides[name] if name in overrides else getattr(entity, name) for name in self.fields]
+
+    def to_dict(self, row: Sequence[Any]) -> dict:
+        values = list(row[:len(self.fields)])
+        for index in self._float_indexes:
+            if values[index] is not None:
+                values[index] = float(values[index])
+        return dict(zip(self.fields, values))
+
+    def to_dicts(self, rows: Iterable[Sequence[Any]]) -> List[dict]:
+        return [self.to_dict(row) for row in rows]
+
+
+def dumps(data: Any) -> bytes:
+    """orjson encoding matching pydantic's JSON output (compact, UTC rendered as Z)."""
+    return orjson.dumps(data, option=orjson.OPT_UTC_Z)
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import mimetypes
+import os
+import shutil
+from abc import ABC, abstractmethod
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
+from app.core.config import settings
+from app.core.file_responses import IMMUTABLE_CACHE_CONTROL
+from app.core.uploads import run_io
+
+logger = logging.getLogger("kitchentech")
+
+# Files larger than this are written to S3 as a multipart upload of parts this size
+# (S3 requires at least 5 MB per part, except the last)
+S3_MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Keys per DeleteObjects request (the S3 maximum)
+S3_DELETE_BATCH_SIZE = 1000
+
+
+class StoredObject(NamedTuple):
+    size: int
+    version: str  # Changes whenever the content does (mtime, S3 ETag)
+
+
+class MediaStorage(ABC):
+    """
+    Where media files live, addressed by relative keys such as
+    "blobs/ab/cd/<sha256>.jpg".
+
+    Files are produced on local disk (uploads are staged and processed there) and
+    handed over with save(). Public URLs come from url(), never from the key
+    layout, so every API node can share one bucket.
+    """
+
+    name = "base"
+
+    def url(self, key: str) -> str:
+        """Public URL of a stored file."""
+        return f"{settings.MEDIA_URL.rstrip('/')}/{key}"
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """The file of `key` on this host's disk, for backends that keep one."""
+        return None
+
+    @abstractmethod
+    async def save(self, key: str, source: Path) -> None:
+        """Store the local file `source` as `key`, consuming (moving or deleting) it."""
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        """Size and version of `key`, or None if it isn't stored."""
+
+    @abstractmethod
+    async def download(self, key: str, destination: Path) -> None:
+        """Write the content of `key` to the local file `destination`."""
+
+    @abstractmethod
+    async def delete(self, keys: Iterable[str]) -> None:
+        """Remove `keys`; missing ones are ignored."""
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalStorage(MediaStorage):
+    """Files under a local directory, served from it at MEDIA_URL (see routes/media.py)."""
+
+    name = "local"
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def local_path(self, key: str) -> Path:
+        return self.root / key
+
+    def _save(self, key: str, source: Path) -> None:
+        destination = self.root / key
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        # Atomic: readers see the old file or the complete new one
+        os.replace(source, destination)
+
+    async def save(self, key: str, source: Path) -> None:
+        await run_io(self._save, key, source)
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            stat = await run_io(os.stat, self.root / key)
+        except FileNotFoundError:
+            return None
+        return StoredObject(stat.st_size, str(stat.st_mtime_ns))
+
+    async def download(self, key: str, destination: Path) -> None:
+        await run_io(shutil.copyfile, self.root / key, destination)
+
+    def _delete(self, keys: List[str]) -> None:
+        for key in keys:
+            (self.root / key).unlink(missing_ok=True)
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        await run_io(self._delete, list(keys))
+
+
+class S3Storage(MediaStorage):
+    """
+    Objects in an S3-compatible bucket (AWS S3, MinIO, R2, ...).
+
+    MEDIA_URL should point at the bucket's public endpoint or a CDN in front of
+    it. Objects are written with an immutable Cache-Control, since a key never
+    gets new content.
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, region: Optional[str] = None,
+                 access_key_id: Optional[str] = None, secret_access_key: Optional[str] = None):
+        from aiobotocore.session import get_session  # Optional dependency, only needed for the s3 backend
+
+        self.bucket = bucket
+        self._session = get_session()
+        self._client_options = {
+            "endpoint_url": endpoint_url,
+            "region_name": region,
+            "aws_access_key_id": access_key_id,
+            "aws_secret_access_key": secret_access_key,
+        }
+        self._client = None
+        self._client_loop = None
+        self._client_lock: Optional[asyncio.Lock] = None
+        self._exit_stack = AsyncExitStack()
+
+    async def _get_client(self):
+        """
+        The shared client, created on first use. Its connections belong to one
+        event loop, so a new loop (e.g. a script calling asyncio.run twice) gets
+        a new client.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client_loop is not loop:
+            self._client = None
+            self._client_loop = loop
+            self._client_lock = asyncio.Lock()
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    self._exit_stack = AsyncExitStack()
+                    self._client = await self._exit_stack.enter_async_context(
+                        self._session.create_client("s3", **self._client_options)
+                    )
+        return self._client
+
+    @staticmethod
+    def _put_options(key: str):
+        return {
+            "ContentType": mimetypes.guess_type(key)[0] or "application/octet-stream",
+            "CacheControl": IMMUTABLE_CACHE_CONTROL,
+        }
+
+    async def save(self, key: str, source: Path) -> None:
+        client = await self._get_client()
+        size = source.stat().st_size
+        if size <= S3_MULTIPART_CHUNK_SIZE:
+            body = await run_io(source.read_bytes)
+            await client.put_object(Bucket=self.bucket, Key=key, Body=body, **self._put_options(key))
+        else:
+            await self._save_multipart(client, key, source)
+        source.unlink(missing_ok=True)
+
+    async def _save_multipart(self, client, key: str, source: Path) -> None:
+        """Stream `source` in S3_MULTIPART_CHUNK_SIZE parts; only one part is in memory at a time."""
+        upload_id = (await client.create_multipart_upload(
+            Bucket=self.bucket, Key=key, **self._put_options(key)
+        ))["UploadId"]
+        parts: List[dict] = []
+        try:
+            with open(source, "rb") as file:
+                while chunk := await run_io(file.read, S3_MULTIPART_CHUNK_SIZE):
+                    part = await client.upload_part(
+                        Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=len(parts) + 1, Body=chunk
+                    )
+                    parts.append({"PartNumber": len(parts) + 1, "ETag": part["ETag"]})
+            await client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            # Uploaded parts are billed until the upload is aborted
+            await asyncio.shield(client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id))
+            raise
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        from botocore.exceptions import ClientError
+
+        client = await self._get_client()
+        try:
+            head = await client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return StoredObject(head["ContentLength"], head["ETag"])
+
+    async def download(self, key: str, destination: Path) -> None:
+        client = await self._get_client()
+        response = await client.get_object(Bucket=self.bucket, Key=key)
+        with open(destination, "wb") as file:
+            async with response["Body"] as stream:
+                while chunk := await stream.read(S3_MULTIPART_CHUNK_SIZE):
+                    await run_io(file.write, chunk)
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        client = await self._get_client()
+        keys = list(keys)
+        for start in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+            batch = keys[start:start + S3_DELETE_BATCH_SIZE]
+            result = await client.delete_objects(
+                Bucket=self.bucket, Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+            )
+            for error in result.get("Errors", []):
+                logger.warning(f"⚠️  Could not delete {error.get('Key')} from storage: {error.get('Message')}")
+
+    async def close(self) -> None:
+        await self._exit_stack.aclose()
+        self._client = None
+
+
+def create_storage() -> MediaStorage:
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage(
+            settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY
+        )
+    return LocalStorage(Path(settings.MEDIA_ROOT))
+
+
+storage = create_storage()
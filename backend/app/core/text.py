@@ -0,0 +1,32 @@
+import re
+
+# Postgres text search configuration used for listings. 'simple' does no stemming,
+# which keeps Arabic and English tokens intact; normalization below does the rest.
+SEARCH_CONFIG = "simple"
+
+# Harakat (fathatan .. sukun and the other combining marks up to U+065F),
+# superscript alef and tatweel carry no meaning for search
+_ARABIC_MARKS = re.compile("[\u064B-\u065F\u0670\u0640]")
+
+# Definite article "ال" at the start of a word that keeps at least two letters
+_ARABIC_ARTICLE = re.compile(r"(^|\s)ال(?=\S{2,})")
+
+# Letter variants folded to a single form: أ إ آ ٱ -> ا, ى -> ي, ة -> ه, ؤ -> و, ئ -> ي
+_ARABIC_LETTERS = str.maketrans("أإآٱىةؤئ", "اااايهوي")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    Normalize Arabic/English text for full-text search.
+
+    Must stay in sync with the kt_normalize_search_text() SQL function that
+    feeds the listings.search_vector generated column.
+    """
+    if not text:
+        return ""
+    text = _ARABIC_MARKS.sub("", text.lower())
+    text = text.translate(_ARABIC_LETTERS)
+    text = _ARABIC_ARTICLE.sub(r"\1", text)
+    return _WHITESPACE.sub(" ", text).strip()
@@ -0,0 +1,63 @@
+import asyncio
+import functools
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+from fastapi import UploadFile
+from app.core.config import settings
+
+# Bytes held in memory per upload at any time
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Upload file I/O gets its own threads, so a burst of uploads can't take all of the
+# default executor's threads from everything else run through asyncio.to_thread
+_io_pool = ThreadPoolExecutor(max_workers=settings.UPLOAD_IO_THREADS, thread_name_prefix="upload-io")
+
+
+async def run_io(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run blocking file I/O (uploads, media, caches) in the upload thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_pool, functools.partial(func, *args, **kwargs))
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+class SavedUpload(NamedTuple):
+    path: Path  # Complete temporary file; rename it into place or delete it
+    size: int
+    sha256: str  # Hex digest of the content
+
+
+async def save_upload(upload: UploadFile, directory: Path, max_size: int) -> SavedUpload:
+    """
+    Stream `upload` to a temporary file in `directory` in UPLOAD_CHUNK_SIZE chunks.
+
+    The SHA-256 of the content is computed on the way, and writes run in the
+    upload thread pool. Raises UploadTooLargeError as soon as more than `max_size` bytes
+    were read; the temporary file is removed on any failure. Being in `directory`,
+    the file can be moved into place with an atomic os.replace, so readers never
+    see a partial file.
+    """
+    fd, temp_name = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    temp_file = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        try:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(f"File is larger than {max_size} bytes")
+                digest.update(chunk)
+                await run_io(temp_file.write, chunk)
+        finally:
+            await run_io(temp_file.close)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    return SavedUpload(Path(temp_name), size, digest.hexdigest())
@@ -1,5 +1,7 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 
@@ -17,6 +19,30 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, executed like any other statement."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def explain_plan(db: Session, query) -> dict:
+    """
+    Top plan node of a query (Postgres only), without running the query.
+    
+    Parameters go through the normal execute path, so they are bound exactly as
+    the real query would bind them (e.g. enums by name).
+    """
+    plan = db.execute(_Explain(query.statement)).scalar()
+    return plan[0]["Plan"]
+
+
 def get_db() -> Session:
     """Dependency for getting database session."""
     db = SessionLocal()
@@ -41,7 +67,11 @@ def init_db():
         plan,
         subscription,
         contact_message,
-        site_setting
+        site_setting,
+        quote_request,
+        city,
+        listing_similar,
+        media_blob
     )  # noqa
     # Note: Base.metadata.create_all() is commented out
     # Use Alembic migrations instead: alembic upgrade head
@@ -1,15 +1,20 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from pathlib import Path
+import asyncio
 import logging
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from app.core.config import settings
-from app.database import init_db
-from app.routes import auth, listings, ai, images, admin, contact, plans, profile, favorites, settings as settings_routes, quotes
+from app.database import init_db, SessionLocal
+from app.core.cities import city_index
+from app.services.price_comparables import run_price_comparables_refresher
+from app.core.storage import storage
+from app.services.image_processing import shutdown_image_pool
+from app.services.image_duplicates import image_hash_index
+from app.routes import auth, listings, ai, images, admin, contact, plans, profile, favorites, settings as settings_routes, quotes, cities, media
 
 # Configure logging
 logging.basicConfig(
@@ -21,8 +26,8 @@ logger = logging.getLogger("kitchentech")
 # Validate settings at startup
 settings.validate_settings()
 
-# Create media directory if it doesn't exist
-MEDIA_DIR = Path("media")
+# Create media directory if it doesn't exist (also upload scratch space with remote storage)
+MEDIA_DIR = Path(settings.MEDIA_ROOT)
 MEDIA_DIR.mkdir(parents=True, exist_ok=True)
 
 # Initialize rate limiter (slowapi)
@@ -48,6 +53,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Total-Count", "X-Total-Count-Mode"],
 )
 
 # Global exception handler for production (hide internal errors)
@@ -65,8 +71,8 @@ async def global_exception_handler(request: Request, exc: Exception):
             content={"detail": "An internal error occurred. Please contact support if the problem persists."}
         )
 
-# Mount static files for serving uploaded images
-app.mount("/media", StaticFiles(directory="media"), name="media")
+# Uploaded images and on-demand resizes (immutable caching, ranges, X-Accel-Redirect)
+app.include_router(media.router)
 
 # Include routers
 app.include_router(auth.router)
@@ -80,6 +86,7 @@ app.include_router(plans.router)
 app.include_router(profile.router)
 app.include_router(favorites.router)
 app.include_router(settings_routes.router)
+app.include_router(cities.router)
 
 
 @app.on_event("startup")
@@ -92,14 +99,45 @@ async def startup_event():
         logger.error(f"⚠️  Database initialization failed: {e}")
         logger.warning(f"⚠️  API will run but database operations will fail")
     
+    # Load the canonical city dictionary (falls back to the built-in list)
+    db = SessionLocal()
+    try:
+        city_index.load(db)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠️  City index not loaded from database, using built-in list: {e}")
+    
+    # Perceptual hashes of all listing images, for the admin near-duplicate flags
+    try:
+        image_hash_index.load(db)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠️  Image hash index not loaded: {e}")
+    finally:
+        db.close()
+    
+    # Keep the price suggestion comparables fresh in the background
+    app.state.price_comparables_task = asyncio.create_task(run_price_comparables_refresher())
+    
     logger.info(f"🚀 {settings.APP_NAME} v{settings.APP_VERSION} started!")
     logger.info(f"🌍 Environment: {settings.APP_ENV}")
     logger.info(f"🔒 Debug mode: {settings.is_debug_mode()}")
     logger.info(f"🌐 Allowed origins: {settings.allowed_origins_list}")
+    logger.info(f"📦 Media storage: {storage.name} ({settings.MEDIA_URL})")
     if settings.is_debug_mode():
         logger.info(f"📚 API Documentation: http://localhost:8000/docs")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks and worker processes."""
+    task = getattr(app.state, "price_comparables_task", None)
+    if task:
+        task.cancel()
+    shutdown_image_pool()
+    await storage.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint - API health check."""
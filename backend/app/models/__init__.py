@@ -8,6 +8,9 @@ from app.models.subscription import Subscription, SubscriptionStatus, PaymentSta
 from app.models.contact_message import ContactMessage, ContactMessageType, ContactMessageStatus
 from app.models.quote_request import QuoteRequest, KitchenStyle, QuoteRequestStatus
 from app.models.site_setting import SiteSetting
+from app.models.city import City
+from app.models.listing_similar import ListingSimilar
+from app.models.media_blob import MediaBlob
 
 __all__ = [
     "User", "UserRole", "UserStatus",
@@ -18,5 +21,8 @@ __all__ = [
     "Subscription", "SubscriptionStatus", "PaymentStatus",
     "ContactMessage", "ContactMessageType", "ContactMessageStatus",
     "QuoteRequest", "KitchenStyle", "QuoteRequestStatus",
-    "SiteSetting"
+    "SiteSetting",
+    "City",
+    "ListingSimilar",
+    "MediaBlob"
 ]
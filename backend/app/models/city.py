@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Boolean, JSON
+from app.database import Base
+
+
+class City(Base):
+    """Canonical city reference used to normalize listing and quote locations."""
+    
+    __tablename__ = "cities"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String(50), unique=True, nullable=False, index=True)  # riyadh, jeddah, ...
+    name_ar = Column(String(100), nullable=False)  # الرياض
+    name_en = Column(String(100), nullable=False)  # Riyadh
+    aliases = Column(JSON, default=list)  # Alternative spellings in either language
+    is_active = Column(Boolean, default=True)
+    
+    def __repr__(self):
+        return f"<City(id={self.id}, slug={self.slug})>"
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, Computed, func, false, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from app.database import Base
 import enum
@@ -26,7 +27,10 @@ class Listing(Base):
     price = Column(Float, nullable=False)
     
     # Location
-    city = Column(String, nullable=False, index=True)
+    city = Column(String, nullable=False, index=True)  # Free text as entered by the advertiser
+    city_id = Column(Integer, ForeignKey("cities.id"), nullable=True, index=True)  # Resolved canonical city
+    latitude = Column(Float, nullable=True)  # WGS84 degrees, optional
+    longitude = Column(Float, nullable=True)
     
     # Status and Type
     status = Column(SQLEnum(ListingStatus), default=ListingStatus.PENDING, index=True, nullable=False)
@@ -43,18 +47,58 @@ class Listing(Base):
     height_m = Column(Float)
     
     # Featured
-    is_featured = Column(Boolean, default=False, index=True)
+    is_featured = Column(Boolean, default=False, server_default=false(), nullable=False, index=True)
     featured_until = Column(DateTime)
     
+    # Images
+    cover_image_url = Column(String, nullable=True)  # URL of the first image, kept in sync by routes/images.py
+    
+    # Full-text search document (generated by Postgres, see kt_normalize_search_text)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', kt_normalize_search_text(title)), 'A') || "
+            "setweight(to_tsvector('simple', kt_normalize_search_text(description)), 'B')",
+            persisted=True
+        )
+    ))
+    
     # Metadata
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     owner = relationship("User", back_populates="listings")
-    images = relationship("ListingImage", back_populates="listing", cascade="all, delete-orphan")
+    city_ref = relationship("City")
+    images = relationship(
+        "ListingImage", back_populates="listing", cascade="all, delete-orphan", order_by="ListingImage.id"
+    )
     favorited_by = relationship("Favorite", back_populates="listing", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Listing(id={self.id}, title={self.title}, status={self.status})>"
+
+
+# Composite indexes backing the keyset-paginated sort orders of the listings feed
+Index("ix_listings_status_created_at_id", Listing.status, Listing.created_at.desc(), Listing.id.desc())
+Index("ix_listings_status_price_id", Listing.status, Listing.price, Listing.id)  # Also scanned backwards for price_desc
+Index(
+    "ix_listings_status_featured_created_at_id",
+    Listing.status, Listing.is_featured.desc(), Listing.created_at.desc(), Listing.id.desc()
+)
+
+# Trigram index so free-text city filters (ILIKE '%...%') that do not resolve to a
+# canonical city can still use an index
+Index("ix_listings_city_trgm", Listing.city, postgresql_using="gin", postgresql_ops={"city": "gin_trgm_ops"})
+
+# GiST index on the earthdistance point for near= radius searches (cube + earthdistance extensions)
+Index(
+    "ix_listings_earth_point",
+    func.ll_to_earth(Listing.latitude, Listing.longitude),
+    postgresql_using="gist",
+    postgresql_where=Listing.latitude.isnot(None) & Listing.longitude.isnot(None)
+)
+
+# GIN index for the q= full-text filter
+Index("ix_listings_search_vector", Listing.search_vector, postgresql_using="gin")
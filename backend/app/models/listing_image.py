@@ -1,22 +1,50 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Any, Dict, List, Optional
 from app.database import Base
 
 
+def image_srcset(
+    url: str,
+    width: Optional[int],
+    height: Optional[int],
+    variants: Optional[List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """Every available rendition of an image, smallest first, ending with the original."""
+    sources = [
+        {"url": variant["url"], "width": variant["width"], "height": variant["height"]}
+        for variant in variants or []
+    ]
+    sources.append({"url": url, "width": width, "height": height})
+    return sources
+
+
 class ListingImage(Base):
     """Image model for kitchen listing photos."""
     
     __tablename__ = "listing_images"
     
     id = Column(Integer, primary_key=True, index=True)
-    listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), nullable=False)
+    listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), nullable=False, index=True)
     url = Column(String, nullable=False)
     filename = Column(String, nullable=False)
+    blob_sha256 = Column(String(64), ForeignKey("media_blobs.sha256"), nullable=True, index=True)  # NULL for legacy per-listing files
+    width = Column(Integer, nullable=True)  # Original size in pixels, NULL for images without derivatives
+    height = Column(Integer, nullable=True)
+    variants = Column(JSON, nullable=True)  # WebP derivatives, smallest first: [{"url", "width", "height"}, ...]
+    dhash = Column(BigInteger, nullable=True)  # Perceptual hash for near-duplicate detection (see image_duplicates)
+    blurhash = Column(String(64), nullable=True)  # Loading placeholders (image_processing.blurhash, preview_data_uri)
+    preview = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Backfills change rows; drives the images ETag and image_duplicates
     
     # Relationships
     listing = relationship("Listing", back_populates="images")
     
+    @property
+    def srcset(self) -> List[Dict[str, Any]]:
+        return image_srcset(self.url, self.width, self.height, self.variants)
+    
     def __repr__(self):
         return f"<ListingImage(id={self.id}, listing_id={self.listing_id}, filename={self.filename})>"
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, SmallInteger, Float, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+class ListingSimilar(Base):
+    """Precomputed nearest neighbours of a listing (see app.services.similar_listings)."""
+    
+    __tablename__ = "listing_similar"
+    
+    # Primary key (listing_id, rank) makes "top K of a listing" a single index range scan
+    listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)  # 1 = most similar
+    similar_listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), nullable=False, index=True)
+    score = Column(Float, nullable=False)  # Cosine similarity
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<ListingSimilar(listing_id={self.listing_id}, rank={self.rank}, similar_listing_id={self.similar_listing_id})>"
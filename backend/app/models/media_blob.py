@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, JSON
+from datetime import datetime
+from app.database import Base
+
+
+class MediaBlob(Base):
+    """Uploaded file stored once by content (see app.services.media_blobs)."""
+    
+    __tablename__ = "media_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)  # Hex digest of the file content
+    path = Column(String, nullable=False)  # Storage key (app.core.storage), e.g. blobs/ab/cd/<sha256>.jpg
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # ListingImage rows using this blob
+    width = Column(Integer, nullable=True)  # Set once the derivatives are rendered
+    height = Column(Integer, nullable=True)
+    variants = Column(JSON, nullable=True)  # [{"path", "width", "height"}, ...], smallest first
+    dhash = Column(BigInteger, nullable=True)  # Perceptual hash (image_processing.difference_hash)
+    blurhash = Column(String(64), nullable=True)  # Loading placeholders, copied to ListingImage
+    preview = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<MediaBlob(sha256={self.sha256}, ref_count={self.ref_count})>"
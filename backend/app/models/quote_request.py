@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum
 from datetime import datetime
 from app.database import Base
 import enum
@@ -33,6 +33,7 @@ class QuoteRequest(Base):
         index=True
     )
     city = Column(String(100), nullable=False, index=True)
+    city_id = Column(Integer, ForeignKey("cities.id"), nullable=True, index=True)
     phone = Column(String(20), nullable=False, index=True)
     status = Column(
         SQLEnum(QuoteRequestStatus, values_callable=lambda x: [e.value for e in x]),
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime
+from datetime import datetime
 from app.database import Base
 
 
@@ -12,6 +13,8 @@ class SiteSetting(Base):
     value = Column(Text, nullable=True)
     description = Column(String, nullable=True)
     is_public = Column(Boolean, default=False)  # Whether setting is accessible via public API
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Drives the public settings ETag
     
     def __repr__(self):
         return f"<SiteSetting(key={self.key})>"
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel, EmailStr
@@ -6,8 +7,11 @@ from datetime import datetime
 import logging
 
 from app.database import get_db
-from app.models import User, UserRole, UserStatus, Listing, ListingStatus, Subscription, Plan
+from app.models import User, UserRole, UserStatus, Listing, ListingStatus, ListingImage, Subscription, Plan
 from app.routes.auth import get_current_user
+from app.core.cache import cache_stats, invalidate_listing
+from app.core import serialization
+from app.services.image_duplicates import image_hash_index
 
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
@@ -36,6 +40,9 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+user_row_serializer = serialization.RowSerializer(UserResponse)
+
+
 class UserUpdate(BaseModel):
     full_name: Optional[str] = None
     email: Optional[EmailStr] = None
@@ -54,7 +61,7 @@ class ListingResponse(BaseModel):
     status: ListingStatus
     is_featured: bool
     owner_id: int
-    owner_name: Optional[str]
+    owner_name: Optional[str] = None
     created_at: datetime
     rejection_reason: Optional[str]
     
@@ -62,6 +69,20 @@ class ListingResponse(BaseModel):
         from_attributes = True
 
 
+class DuplicateImageMatch(BaseModel):
+    image_id: int  # Image of the listing being viewed
+    matched_image_id: int
+    matched_image_url: str
+    matched_listing_id: int
+    matched_listing_title: str
+    matched_owner_id: int
+    distance: int  # Differing bits of the 64-bit perceptual hashes, 0 = same photo
+
+
+class ListingDetailResponse(ListingResponse):
+    duplicate_images: List[DuplicateImageMatch] = []
+
+
 class ListingReview(BaseModel):
     status: ListingStatus
     rejection_reason: Optional[str] = None
@@ -160,20 +181,34 @@ async def get_all_users(
     admin: User = Depends(verify_admin)
 ):
     """Get all users with optional filters."""
-    query = db.query(User)
+    
+    # Ads per owner, counted in one grouped query instead of once per user
+    ads_counts = db.query(
+        Listing.owner_id, func.count(Listing.id).label("ads_count")
+    ).group_by(Listing.owner_id).subquery()
+    ads_count = func.coalesce(ads_counts.c.ads_count, 0)
+    
+    fast_json = serialization.fast_json_enabled()
+    if fast_json:
+        query = db.query(*user_row_serializer.columns(User, ads_count=ads_count))
+    else:
+        query = db.query(User, ads_count)
+    query = query.outerjoin(ads_counts, ads_counts.c.owner_id == User.id)
     
     if role:
         query = query.filter(User.role == role)
     if status:
         query = query.filter(User.status == status)
     
-    users = query.offset(skip).limit(limit).all()
+    rows = query.order_by(User.id).offset(skip).limit(limit).all()
+    
+    if fast_json:
+        return Response(content=serialization.dumps(user_row_serializer.to_dicts(rows)), media_type="application/json")
     
-    # Add ads count for each user
     result = []
-    for user in users:
+    for user, user_ads_count in rows:
         user_data = UserResponse.from_orm(user)
-        user_data.ads_count = db.query(Listing).filter(Listing.owner_id == user.id).count()
+        user_data.ads_count = user_ads_count
         result.append(user_data)
     
     return result
@@ -307,19 +342,76 @@ async def get_all_listings(
     return result
 
 
-@router.get("/listings/{listing_id}", response_model=ListingResponse)
+MAX_DUPLICATE_MATCHES = 50
+
+
+def _duplicate_images(db: Session, listing: Listing) -> List[DuplicateImageMatch]:
+    """Images of other owners' listings that look like this listing's images."""
+    image_hash_index.catch_up(db)
+    
+    candidates = []
+    images = db.query(ListingImage.id, ListingImage.dhash).filter(
+        ListingImage.listing_id == listing.id,
+        ListingImage.dhash.isnot(None)
+    ).all()
+    for image_id, dhash in images:
+        for match in image_hash_index.near(dhash):
+            if match.owner_id != listing.owner_id:
+                candidates.append((match.distance, image_id, match.image_id))
+    if not candidates:
+        return []
+    candidates.sort()
+    
+    # The index may still hold deleted images; read the matches back
+    matched = {
+        row[0]: row for row in db.query(
+            ListingImage.id, ListingImage.url, Listing.id, Listing.title, Listing.owner_id
+        ).join(
+            Listing, Listing.id == ListingImage.listing_id
+        ).filter(
+            ListingImage.id.in_({matched_id for _, _, matched_id in candidates})
+        ).all()
+    }
+    
+    result = []
+    for distance, image_id, matched_id in candidates:
+        row = matched.get(matched_id)
+        if row is None or row[4] == listing.owner_id:
+            continue
+        result.append(DuplicateImageMatch(
+            image_id=image_id,
+            matched_image_id=matched_id,
+            matched_image_url=row[1],
+            matched_listing_id=row[2],
+            matched_listing_title=row[3],
+            matched_owner_id=row[4],
+            distance=distance
+        ))
+        if len(result) == MAX_DUPLICATE_MATCHES:
+            break
+    return result
+
+
+@router.get("/listings/{listing_id}", response_model=ListingDetailResponse)
 async def get_listing(
     listing_id: int,
     db: Session = Depends(get_db),
     admin: User = Depends(verify_admin)
 ):
-    """Get listing by ID."""
+    """
+    Get listing by ID.
+    
+    duplicate_images lists other owners' images that are the same or nearly the
+    same photo as one of this listing's images (re-encoded, resized, lightly
+    edited), closest first - a strong hint of stolen or spam photos.
+    """
     listing = db.query(Listing).filter(Listing.id == listing_id).first()
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
     
-    listing_data = ListingResponse.from_orm(listing)
+    listing_data = ListingDetailResponse.from_orm(listing)
     listing_data.owner_name = listing.owner.full_name if listing.owner else None
+    listing_data.duplicate_images = _duplicate_images(db, listing)
     return listing_data
 
 
@@ -343,6 +435,7 @@ async def review_listing(
     
     db.commit()
     db.refresh(listing)
+    invalidate_listing(listing_id)
     
     logger.info(f"🔍 Listing {listing_id} status changed from {old_status} to {review.status.value} by admin {admin.id}")
     if review.rejection_reason:
@@ -372,6 +465,7 @@ async def toggle_featured(
     
     listing.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_listing(listing_id)
     
     return {
         "message": f"Listing {'featured' if listing.is_featured else 'unfeatured'} successfully",
@@ -379,6 +473,18 @@ async def toggle_featured(
     }
 
 
+# ============================================================================
+# Cache Statistics
+# ============================================================================
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    admin: User = Depends(verify_admin)
+):
+    """Hit/miss counters of the application caches (per worker process)."""
+    return cache_stats()
+
+
 # ============================================================================
 # Plan Management
 # ============================================================================
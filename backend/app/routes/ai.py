@@ -7,6 +7,7 @@ from app.models.user import User
 from app.models.listing import Listing
 from app.core.security import get_current_user
 from app.core.config import settings
+from app.services.price_comparables import price_comparables
 
 router = APIRouter(prefix="/api/v1/ai", tags=["ai"])
 
@@ -39,17 +40,28 @@ class KitchenDescriptionResponse(BaseModel):
 
 
 class SuggestPriceRequest(BaseModel):
-    kitchen_type: str
-    square_footage: int = None
-    equipment: str = None
+    kitchen_type: str  # Listing type: new / used / ready / custom
     city: str
-    state: str = None
+    material: Optional[str] = None
+    length_m: Optional[float] = None
+    # Deprecated, accepted from older clients and ignored
+    square_footage: Optional[int] = None
+    equipment: Optional[str] = None
+    state: Optional[str] = None
 
 
 class SuggestPriceResponse(BaseModel):
-    suggested_price_per_hour: float
-    suggested_price_per_day: float
+    # Prices are None when there are not enough comparables (confidence_label "none")
+    suggested_price: Optional[float] = None  # SAR, median of the comparables
+    price_range_low: Optional[float] = None  # 25th percentile
+    price_range_high: Optional[float] = None  # 75th percentile
+    comparables_count: int  # Sample size behind the suggestion, 0 without one
+    confidence: float  # 0..1
+    confidence_label: str  # high / medium / low / none
     reasoning: str
+    # Deprecated names from the old rental-rate response, both equal to suggested_price
+    suggested_price_per_hour: Optional[float] = None
+    suggested_price_per_day: Optional[float] = None
 
 
 class EnhanceListingRequest(BaseModel):
@@ -59,7 +71,7 @@ class EnhanceListingRequest(BaseModel):
 class EnhanceListingResponse(BaseModel):
     listing_id: int
     enhanced_description: str
-    suggested_price: float
+    suggested_price: Optional[float] = None  # None when there are not enough comparables
     original_price: float
 
 
@@ -108,55 +120,36 @@ def generate_ai_description(
 def suggest_ai_price(
     kitchen_type: str,
     city: str,
-    square_footage: Optional[int] = None,
-    equipment: Optional[str] = None,
-    state: Optional[str] = None
-) -> dict:
+    material: Optional[str] = None,
+    length_m: Optional[float] = None
+) -> Optional[dict]:
     """
-    Suggest pricing using AI-based market analysis.
+    Suggest a price from comparable approved listings.
     
-    TODO: Integrate with OpenAI API and real market data when available.
-    Currently uses a simple heuristic-based pricing model.
+    Uses the in-memory segment price distributions of app.services.price_comparables
+    (refreshed in the background), falling back from city/type/material/size to
+    broader segments until enough comparables are found. Returns None when even the
+    broadest segment is too small.
     """
     
-    # Base price per hour (simple heuristic)
-    base_price = 25.0
-    
-    # Adjust based on kitchen type
-    type_multipliers = {
-        "commercial": 1.5,
-        "professional": 1.4,
-        "home": 0.8,
-        "shared": 0.9,
-        "industrial": 1.8
-    }
-    
-    multiplier = type_multipliers.get(kitchen_type.lower(), 1.0)
-    price_per_hour = base_price * multiplier
-    
-    # Adjust for square footage
-    if square_footage:
-        if square_footage > 1000:
-            price_per_hour *= 1.3
-        elif square_footage > 500:
-            price_per_hour *= 1.15
-    
-    # City-based adjustments (placeholder)
-    high_cost_cities = ["new york", "san francisco", "los angeles", "boston", "seattle"]
-    if city and any(hc_city in city.lower() for hc_city in high_cost_cities):
-        price_per_hour *= 1.25
-    
-    # Calculate daily price (with discount for longer rental)
-    price_per_day = price_per_hour * 8 * 0.85  # 15% discount for daily rental
+    suggestion = price_comparables.suggest(city=city, type=kitchen_type, material=material, length_m=length_m)
+    if suggestion is None:
+        return None
     
-    reasoning = f"Based on {kitchen_type} kitchen type in {city}"
-    if square_footage:
-        reasoning += f" with {square_footage} sq ft"
-    reasoning += f". Market analysis suggests ${price_per_hour:.2f}/hour pricing."
+    segment = ", ".join(f"{name}={value}" for name, value in suggestion.segment.items()) or "all listings"
+    reasoning = (
+        f"Median of {suggestion.stats.count} comparable approved listings ({segment}): "
+        f"{suggestion.price:,.0f} SAR, typical range {suggestion.low:,.0f}-{suggestion.high:,.0f} SAR. "
+        f"Confidence {suggestion.confidence_label} ({suggestion.confidence:.2f})."
+    )
     
     return {
-        "price_per_hour": round(price_per_hour, 2),
-        "price_per_day": round(price_per_day, 2),
+        "price": suggestion.price,
+        "low": suggestion.low,
+        "high": suggestion.high,
+        "count": suggestion.stats.count,
+        "confidence": suggestion.confidence,
+        "confidence_label": suggestion.confidence_label,
         "reasoning": reasoning
     }
 
@@ -189,23 +182,38 @@ async def suggest_price(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get AI-powered price suggestions based on kitchen attributes and market data.
+    Get a price suggestion based on kitchen attributes and market data.
     
-    Analyzes similar listings and market trends to recommend optimal pricing.
+    Uses the price distribution of comparable approved listings (same city, type,
+    material and size where enough exist). Without enough comparables the prices are
+    null, with confidence 0 and confidence_label "none".
     """
     
     pricing_data = suggest_ai_price(
         kitchen_type=request.kitchen_type,
         city=request.city,
-        square_footage=request.square_footage,
-        equipment=request.equipment,
-        state=request.state
+        material=request.material,
+        length_m=request.length_m
     )
     
+    if pricing_data is None:
+        return SuggestPriceResponse(
+            comparables_count=0,
+            confidence=0.0,
+            confidence_label="none",
+            reasoning="Not enough comparable approved listings to suggest a price."
+        )
+    
     return SuggestPriceResponse(
-        suggested_price_per_hour=pricing_data["price_per_hour"],
-        suggested_price_per_day=pricing_data["price_per_day"],
-        reasoning=pricing_data["reasoning"]
+        suggested_price=pricing_data["price"],
+        price_range_low=pricing_data["low"],
+        price_range_high=pricing_data["high"],
+        comparables_count=pricing_data["count"],
+        confidence=pricing_data["confidence"],
+        confidence_label=pricing_data["confidence_label"],
+        reasoning=pricing_data["reasoning"],
+        suggested_price_per_hour=pricing_data["price"],
+        suggested_price_per_day=pricing_data["price"]
     )
 
 
@@ -297,9 +305,9 @@ async def enhance_listing(
     db: Session = Depends(get_db)
 ):
     """
-    Enhance an existing listing with AI-generated description and price suggestions.
+    Suggest an enhanced description and a price for an existing listing.
     
-    Updates the listing with AI-generated content for better market appeal.
+    The listing itself is not modified; the owner decides what to apply.
     """
     
     listing = db.query(Listing).filter(Listing.id == listing_id).first()
@@ -317,34 +325,27 @@ async def enhance_listing(
         )
     
     # Generate enhanced description
-    enhanced_description = generate_ai_description(
-        kitchen_type=listing.kitchen_type or "commercial",
-        square_footage=listing.square_footage,
-        equipment=listing.equipment,
-        city=listing.city
+    enhanced_description = generate_kitchen_description(
+        title=listing.title,
+        city=listing.city,
+        type_=listing.type or "",
+        material=listing.material or "unknown",
+        price=listing.price
     )
     
     # Generate price suggestion
     pricing_data = suggest_ai_price(
-        kitchen_type=listing.kitchen_type or "commercial",
+        kitchen_type=listing.type or "",
         city=listing.city,
-        square_footage=listing.square_footage,
-        equipment=listing.equipment,
-        state=listing.state
+        material=listing.material,
+        length_m=listing.length_m
     )
     
-    # Update listing with AI-generated content
-    listing.ai_generated_description = enhanced_description
-    listing.ai_suggested_price = pricing_data["price_per_hour"]
-    
-    db.commit()
-    db.refresh(listing)
-    
     return EnhanceListingResponse(
         listing_id=listing.id,
         enhanced_description=enhanced_description,
-        suggested_price=pricing_data["price_per_hour"],
-        original_price=listing.price_per_hour
+        suggested_price=pricing_data["price"] if pricing_data else None,
+        original_price=listing.price
     )
 
 
@@ -357,7 +358,9 @@ async def ai_health_check():
         "openai_configured": bool(settings.OPENAI_API_KEY),
         "features": {
             "description_generation": "template-based",  # Change to "ai-powered" when OpenAI is integrated
-            "price_suggestion": "heuristic-based",  # Change to "ai-powered" when integrated
+            "price_suggestion": "comparables-based",
+            "price_comparables_listings": price_comparables.listings_count,
+            "price_comparables_segments": price_comparables.segments_count(),
             "listing_enhancement": "available"
         },
         "note": "Configure OPENAI_API_KEY for full AI capabilities"
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+from typing import List
+
+from app.core.cities import city_index, CityEntry
+
+
+router = APIRouter(prefix="/api/v1/cities", tags=["cities"])
+
+
+# ============================================================================
+# Pydantic Schemas
+# ============================================================================
+
+class CityResponse(BaseModel):
+    id: int
+    slug: str
+    name_ar: str
+    name_en: str
+
+
+def _to_response(city: CityEntry) -> CityResponse:
+    return CityResponse(id=city.id, slug=city.slug, name_ar=city.name_ar, name_en=city.name_en)
+
+
+# ============================================================================
+# City Routes
+# ============================================================================
+
+@router.get("/autocomplete", response_model=List[CityResponse])
+async def autocomplete_cities(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=20)
+):
+    """
+    Suggest cities whose Arabic or English name starts with `q`.
+    
+    Served from the in-memory city index loaded at startup (no database access).
+    """
+    return [_to_response(city) for city in city_index.autocomplete(q, limit)]
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 from typing import List
 from pydantic import BaseModel
@@ -7,6 +7,7 @@ from datetime import datetime
 from app.database import get_db
 from app.models import Favorite, Listing, User, ListingImage
 from app.routes.auth import get_current_user
+from app.core import serialization
 
 
 router = APIRouter(prefix="/api/favorites", tags=["favorites"])
@@ -42,6 +43,9 @@ class FavoriteResponse(BaseModel):
         from_attributes = True
 
 
+favorite_listing_row_serializer = serialization.RowSerializer(FavoriteListingResponse)
+
+
 # ============================================================================
 # Favorites Routes
 # ============================================================================
@@ -55,24 +59,34 @@ async def get_my_favorites(
 ):
     """Get all favorites for the current user."""
     
-    favorites = db.query(Favorite).filter(
+    # Owner name is joined in and the cover image is denormalized, so no per-favorite lazy loads
+    listing_columns = favorite_listing_row_serializer.columns(
+        Listing, owner_name=User.full_name, image_url=Listing.cover_image_url
+    )
+    rows = db.query(Favorite.id, Favorite.listing_id, *listing_columns).join(
+        Listing, Listing.id == Favorite.listing_id
+    ).outerjoin(
+        User, User.id == Listing.owner_id
+    ).filter(
         Favorite.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    ).order_by(Favorite.id).offset(skip).limit(limit).all()
+    
+    if serialization.fast_json_enabled():
+        payload = [
+            {"id": row[0], "listing_id": row[1], "listing": favorite_listing_row_serializer.to_dict(row[2:])}
+            for row in rows
+        ]
+        return Response(content=serialization.dumps(payload), media_type="application/json")
     
     result = []
-    for fav in favorites:
-        if fav.listing:
-            listing_data = FavoriteListingResponse.from_orm(fav.listing)
-            listing_data.owner_name = fav.listing.owner.full_name if fav.listing.owner else None
-            # Get first image
-            listing_data.image_url = fav.listing.images[0].image_url if fav.listing.images else None
-            
-            fav_response = FavoriteResponse(
-                id=fav.id,
-                listing_id=fav.listing_id,
-                listing=listing_data
-            )
-            result.append(fav_response)
+    for row in rows:
+        listing_data = FavoriteListingResponse(**dict(zip(favorite_listing_row_serializer.fields, row[2:])))
+        fav_response = FavoriteResponse(
+            id=row[0],
+            listing_id=row[1],
+            listing=listing_data
+        )
+        result.append(fav_response)
     
     return result
 
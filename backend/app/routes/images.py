@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
-import os
-import uuid
+import asyncio
 import logging
+import shutil
+import tempfile
 from pathlib import Path
 from app.database import get_db
 from app.models.listing import Listing
 from app.models.listing_image import ListingImage
 from app.models.user import User
 from app.core.security import get_current_user
+from app.core.cache import invalidate_listing
+from app.core.config import settings
+from app.core.uploads import save_upload, run_io, SavedUpload, UploadTooLargeError
+from app.models.media_blob import MediaBlob
+from app.core.storage import storage
+from app.services.image_processing import process_image, ImageProcessingError
+from app.services.media_blobs import (
+    UPLOAD_STAGING_DIR, acquire_blobs, blob_needs_processing, set_blob_hashes, set_blob_variants,
+    store_blob_variants, blob_image_fields, release_image
+)
+from app.core.etag import make_etag, etag_matches, not_modified, REVALIDATE_CACHE_CONTROL
 
 router = APIRouter(prefix="/api/v1", tags=["images"])
 logger = logging.getLogger("kitchentech")
@@ -20,17 +33,47 @@ MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB in bytes
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
 ALLOWED_CONTENT_TYPES = {'image/jpeg', 'image/png', 'image/webp'}
 
-# Create media directory if it doesn't exist
-MEDIA_DIR = Path("media/listings")
-MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+
+async def _gather_or_cancel(aws):
+    """
+    asyncio.gather, except that when one awaitable fails the others are cancelled
+    and waited for before the error is raised.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _sync_cover_image(db: Session, listing: Listing) -> None:
+    """Point listing.cover_image_url at its first (lowest id) image, or None if it has none."""
+    db.flush()
+    listing.cover_image_url = db.query(ListingImage.url).filter(
+        ListingImage.listing_id == listing.id
+    ).order_by(ListingImage.id).limit(1).scalar()
 
 
 # Pydantic schemas
+class ImageSource(BaseModel):
+    url: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
 class ImageResponse(BaseModel):
     id: int
     listing_id: int
     url: str
     filename: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    srcset: List[ImageSource] = []  # Smallest first, the original last
+    blurhash: Optional[str] = None  # Placeholders to show while loading, NULL until rendered
+    preview: Optional[str] = None  # Tiny WebP as a data: URI
     
     class Config:
         from_attributes = True
@@ -47,6 +90,11 @@ async def upload_listing_images(
     Upload one or more images for a listing.
     Only the listing owner can upload images.
     Security: Max 5MB per file, only jpg/jpeg/png/webp allowed.
+    Files are streamed to disk in chunks and never held in memory whole, up to
+    UPLOAD_CONCURRENCY of them at a time, so a multi-file upload takes about as
+    long as its slowest file. Each image gets 320/640/1280 px WebP derivatives
+    (see srcset), rendered in worker processes. Files are stored by content hash, so re-uploading the same
+    photo (to any listing) reuses the stored file and its derivatives.
     """
     
     # Check if listing exists
@@ -65,12 +113,7 @@ async def upload_listing_images(
             detail="You don't have permission to upload images for this listing"
         )
     
-    # Create listing-specific directory
-    listing_dir = MEDIA_DIR / str(listing_id)
-    listing_dir.mkdir(parents=True, exist_ok=True)
-    
-    uploaded_images = []
-    
+    # Cheap checks first, before any file is read
     for file in files:
         # Security Check 1: Validate content type
         if file.content_type not in ALLOWED_CONTENT_TYPES:
@@ -88,38 +131,100 @@ async def upload_listing_images(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid file extension: {file_extension}. Only .jpg, .jpeg, .png, and .webp are allowed."
             )
+    
+    uploaded_images = []
+    stored_keys = []
+    staging_dir = Path(tempfile.mkdtemp(dir=UPLOAD_STAGING_DIR))
+    limit = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+    
+    async def save(file: UploadFile) -> SavedUpload:
+        # Security Check 3: Stream to disk, stopping as soon as the size limit is exceeded
+        async with limit:
+            try:
+                return await save_upload(file, staging_dir, MAX_FILE_SIZE)
+            except UploadTooLargeError:
+                logger.warning(f"❌ File too large: more than {MAX_FILE_SIZE} bytes for file {file.filename}")
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File size exceeds maximum allowed size of 5 MB: {file.filename}"
+                )
+    
+    async def store(file: UploadFile, blob: MediaBlob, upload: SavedUpload) -> bool:
+        """Store what `blob` is missing; True if that included the original file."""
+        async with limit:
+            stored = await storage.stat(blob.path) is None
+            created = blob.width is None  # Row inserted by this request, nothing rendered yet
+            if not (stored or created or blob_needs_processing(blob)):
+                return False
+            # Security Check 4: Must decode as an image; also renders the WebP derivatives
+            try:
+                processed = await process_image(upload.path, blob.sha256, staging_dir)
+            except ImageProcessingError as e:
+                logger.warning(f"❌ Invalid image {file.filename}: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid image file: {file.filename}"
+                )
+            if stored or created:
+                set_blob_variants(blob, processed)
+                stored_keys.extend(await store_blob_variants(blob, staging_dir))
+            else:
+                # Committed blob whose derivatives other images use: only fill in new columns
+                set_blob_hashes(blob, processed)
+            if stored:
+                await storage.save(blob.path, upload.path)
+                stored_keys.append(blob.path)
+            return stored
+    
+    try:
+        uploads = await _gather_or_cancel([save(file) for file in files])
         
-        # Security Check 3: Read file content and validate size
-        content = await file.read()
-        if len(content) > MAX_FILE_SIZE:
-            logger.warning(f"❌ File too large: {len(content)} bytes for file {file.filename}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File size exceeds maximum allowed size of 5 MB. Your file is {len(content) / (1024*1024):.2f} MB."
-            )
-        
-        # Generate unique filename with validated extension
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = listing_dir / unique_filename
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
-        
-        # Create database record
-        image_url = f"/media/listings/{listing_id}/{unique_filename}"
-        listing_image = ListingImage(
-            listing_id=listing_id,
-            url=image_url,
-            filename=unique_filename
-        )
+        # Identical content is stored once, whichever listing it is uploaded to. The
+        # blob rows stay locked until commit; a concurrent upload or delete of the
+        # same content may hold them, so they are waited for in a thread.
+        blobs = await asyncio.to_thread(acquire_blobs, db, [
+            (upload.sha256, Path(file.filename).suffix.lower(), upload.size)
+            for file, upload in zip(files, uploads)
+        ])
         
-        db.add(listing_image)
-        uploaded_images.append(listing_image)
+        # Store each distinct content once. Every store is waited for, even after
+        # one failed, so none writes files after the cleanup below.
+        first_of = {}
+        for file, blob, upload in zip(files, blobs, uploads):
+            first_of.setdefault(blob.sha256, (file, blob, upload))
+        results = await asyncio.gather(*(store(*args) for args in first_of.values()), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        stored = dict(zip(first_of, results))
+        db.flush()
         
-        logger.info(f"✅ Image uploaded: {unique_filename} for listing {listing_id} by user {current_user.id}")
+        for blob in blobs:
+            # Create database record
+            listing_image = ListingImage(listing_id=listing_id, **blob_image_fields(blob))
+            
+            db.add(listing_image)
+            uploaded_images.append(listing_image)
+            
+            logger.info(
+                f"✅ Image uploaded: {listing_image.filename} for listing {listing_id} by user {current_user.id}"
+                f"{'' if stored[blob.sha256] else ' (existing blob reused)'}"
+            )
+    except BaseException:
+        # Nothing is committed, so don't leave the files of this request behind.
+        # They go before the rollback releases the blob row locks, so no concurrent
+        # upload of the same content can find them and commit a reference to them.
+        try:
+            await storage.delete(stored_keys)
+        finally:
+            db.rollback()
+        raise
+    finally:
+        await run_io(shutil.rmtree, staging_dir, True)
     
+    _sync_cover_image(db, listing)
     db.commit()
+    invalidate_listing(listing_id)
     
     # Refresh all images to get their IDs
     for image in uploaded_images:
@@ -133,19 +238,34 @@ async def upload_listing_images(
 @router.get("/listings/{listing_id}/images", response_model=List[ImageResponse])
 async def get_listing_images(
     listing_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    """Get all images for a specific listing."""
+    """Get all images for a specific listing (supports If-None-Match)."""
     
     # Check if listing exists
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
-    if not listing:
+    listing_exists = db.query(Listing.id).filter(Listing.id == listing_id).first()
+    if not listing_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Listing not found"
         )
     
-    images = db.query(ListingImage).filter(ListingImage.listing_id == listing_id).all()
+    # Count and highest id identify the set; the latest updated_at covers rows
+    # changed in place (build_image_variants.py fills in variants and placeholders)
+    count, last_id, last_updated = db.query(
+        func.count(ListingImage.id), func.max(ListingImage.id), func.max(ListingImage.updated_at)
+    ).filter(
+        ListingImage.listing_id == listing_id
+    ).one()
+    etag = make_etag("listing-images", listing_id, count, last_id, last_updated)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    images = db.query(ListingImage).filter(ListingImage.listing_id == listing_id).order_by(ListingImage.id).all()
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
     return images
 
 
@@ -189,15 +309,11 @@ async def delete_listing_image(
             detail="Image not found"
         )
     
-    # Delete file from disk
-    file_path = Path("media") / "listings" / str(listing_id) / image.filename
-    if file_path.exists():
-        file_path.unlink()
-        logger.info(f"🗑️ Image file deleted: {file_path}")
-    
-    # Delete from database
-    db.delete(image)
+    # Delete from database; shared files go with the last image using them
+    await release_image(db, image)
+    _sync_cover_image(db, listing)
     db.commit()
+    invalidate_listing(listing_id)
     
     logger.info(f"✅ Image deleted: {image.filename} (ID: {image_id}) from listing {listing_id} by user {current_user.id}")
     
@@ -1,13 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
+from sqlalchemy import tuple_, func, case, literal_column, insert, Float, Integer, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session, load_only, selectinload
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, create_model
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+import csv
+import io
+import json
 import logging
-from app.database import get_db
+from app.database import get_db, explain_plan
 from app.models.user import User
-from app.models.listing import Listing
+from app.models.listing import Listing, ListingStatus
+from app.models.listing_similar import ListingSimilar
+from app.models.listing_image import ListingImage, image_srcset
 from app.core.security import get_current_user, get_current_user_optional
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.text import SEARCH_CONFIG, normalize_search_text
+from app.core.cities import city_index
+from app.core.cache import MemoryCache, register_cache, listing_cache, invalidate_listing
+from app.core.config import settings
+from app.core.etag import json_response_with_etag
+from app.core import serialization
+from app.routes.images import ImageSource
 
 router = APIRouter(prefix="/api/v1/listings", tags=["listings"])
 logger = logging.getLogger("kitchentech")
@@ -24,6 +40,8 @@ class ListingCreate(BaseModel):
     length_m: Optional[float] = None
     width_m: Optional[float] = None
     height_m: Optional[float] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class ListingUpdate(BaseModel):
@@ -37,6 +55,8 @@ class ListingUpdate(BaseModel):
     length_m: Optional[float] = None
     width_m: Optional[float] = None
     height_m: Optional[float] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     is_featured: Optional[bool] = None
     featured_until: Optional[datetime] = None
 
@@ -53,8 +73,11 @@ class ListingResponse(BaseModel):
     length_m: Optional[float] = None
     width_m: Optional[float] = None
     height_m: Optional[float] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     is_featured: bool
     featured_until: Optional[datetime] = None
+    cover_image_url: Optional[str] = None
     owner_id: int
     created_at: datetime
     updated_at: datetime
@@ -63,74 +86,766 @@ class ListingResponse(BaseModel):
         from_attributes = True
 
 
+class ListingImageSummary(BaseModel):
+    id: int
+    url: str
+    srcset: List[ImageSource]
+    blurhash: Optional[str] = None
+    preview: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+listing_list_adapter = TypeAdapter(List[ListingResponse])
+listing_row_serializer = serialization.RowSerializer(ListingResponse)
+
+
+class ListingFieldset(NamedTuple):
+    """Response model, list adapter and row serializer for a fields= (and include=) selection."""
+    fields: Tuple[str, ...]
+    model: Any
+    list_adapter: TypeAdapter
+    row_serializer: serialization.RowSerializer  # Column fields only, never `images`
+    with_images: bool = False
+
+
+# fields= whitelists; every name must be a ListingResponse field backed by a column
+LISTING_LIST_FIELDS = tuple(ListingResponse.model_fields)
+LISTING_DETAIL_FIELDS = tuple(ListingResponse.model_fields)
+
+
+# include= options of the list endpoints
+LISTING_INCLUDES = ("images",)
+
+
+@lru_cache(maxsize=256)
+def _listing_fieldset(fields: Tuple[str, ...], with_images: bool = False) -> ListingFieldset:
+    if fields == tuple(ListingResponse.model_fields):
+        fieldset = ListingFieldset(fields, ListingResponse, listing_list_adapter, listing_row_serializer)
+    else:
+        model = create_model(
+            "ListingResponse_" + "_".join(fields),
+            **{name: (ListingResponse.model_fields[name].annotation, ...) for name in fields},
+            __config__={"from_attributes": True}
+        )
+        fieldset = ListingFieldset(fields, model, TypeAdapter(List[model]), serialization.RowSerializer(model))
+    if not with_images:
+        return fieldset
+    model = create_model(
+        fieldset.model.__name__ + "_images",
+        __base__=fieldset.model,
+        images=(List[ListingImageSummary], ...)
+    )
+    return ListingFieldset(fields, model, TypeAdapter(List[model]), fieldset.row_serializer, True)
+
+
+def _parse_include(include: Optional[str]) -> bool:
+    """Validate include=images; returns whether images were requested."""
+    requested = {name.strip() for name in (include or "").split(",") if name.strip()}
+    unknown = requested - set(LISTING_INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}. Allowed: {', '.join(LISTING_INCLUDES)}"
+        )
+    return "images" in requested
+
+
+def _listing_images(db: Session, listing_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Images of many listings in one IN query, in upload order, keyed by listing id."""
+    images: Dict[int, List[Dict[str, Any]]] = {listing_id: [] for listing_id in listing_ids}
+    if not listing_ids:
+        return images
+    rows = db.query(
+        ListingImage.listing_id, ListingImage.id, ListingImage.url,
+        ListingImage.width, ListingImage.height, ListingImage.variants, ListingImage.blurhash, ListingImage.preview
+    ).filter(
+        ListingImage.listing_id.in_(listing_ids)
+    ).order_by(ListingImage.listing_id, ListingImage.id).all()
+    for listing_id, image_id, url, width, height, variants, blurhash, preview in rows:
+        images[listing_id].append({
+            "id": image_id, "url": url, "srcset": image_srcset(url, width, height, variants),
+            "blurhash": blurhash, "preview": preview
+        })
+    return images
+
+
+def _parse_fields(fields: Optional[str], allowed: Tuple[str, ...], with_images: bool = False) -> ListingFieldset:
+    """Validate fields=a,b,c against a whitelist; `id` is always included."""
+    if not fields:
+        return _listing_fieldset(allowed, with_images)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}"
+        )
+    requested.add("id")
+    return _listing_fieldset(tuple(name for name in allowed if name in requested), with_images)
+
+
+class CityFacet(BaseModel):
+    city_id: Optional[int] = None  # None groups listings whose city did not resolve
+    slug: Optional[str] = None
+    name_ar: Optional[str] = None
+    name_en: Optional[str] = None
+    count: int
+
+
+class ValueFacet(BaseModel):
+    value: Optional[str] = None
+    count: int
+
+
+class PriceBucketFacet(BaseModel):
+    min_price: float
+    max_price: Optional[float] = None  # Exclusive; None for the open-ended top bucket
+    count: int
+
+
+class ListingFacetsResponse(BaseModel):
+    total: int
+    cities: List[CityFacet]
+    types: List[ValueFacet]
+    materials: List[ValueFacet]
+    price_buckets: List[PriceBucketFacet]
+
+
+class ListingBatchItem(BaseModel):
+    id: int
+    found: bool
+    listing: Optional[ListingResponse] = None
+
+
+class ListingBatchResponse(BaseModel):
+    items: List[ListingBatchItem]  # One per requested id, in request order
+    missing: List[int]  # Requested ids that do not exist or are not approved
+
+
+class BulkImportRowError(BaseModel):
+    row: int  # 1-based record number, not counting the CSV header
+    errors: List[str]
+
+
+class BulkImportResponse(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[BulkImportRowError]
+    errors_truncated: bool = False  # Only the first BULK_IMPORT_MAX_ERRORS rows are reported
+
+
+class SortOrder(NamedTuple):
+    """Sort keys (ending with the primary key as tie-breaker) and their cursor parsers."""
+    keys: Tuple[Tuple[Any, Callable[[Any], Any]], ...]
+    descending: bool
+
+
+# Every sort order is total (ends with Listing.id) so keyset pagination never
+# skips or repeats rows. Matching composite indexes are declared on the model.
+LISTING_SORTS = {
+    "newest": SortOrder(
+        keys=((Listing.created_at, datetime.fromisoformat), (Listing.id, int)),
+        descending=True
+    ),
+    "price_asc": SortOrder(
+        keys=((Listing.price, float), (Listing.id, int)),
+        descending=False
+    ),
+    "price_desc": SortOrder(
+        keys=((Listing.price, float), (Listing.id, int)),
+        descending=True
+    ),
+    "featured_first": SortOrder(
+        keys=((Listing.is_featured, bool), (Listing.created_at, datetime.fromisoformat), (Listing.id, int)),
+        descending=True
+    ),
+}
+
+# Multiplier applied to the text rank of featured listings in sort=relevance
+FEATURED_RANK_BOOST = 1.5
+
+
+# Largest radius accepted by near= searches
+MAX_RADIUS_KM = 500
+
+
+class GeoFilter(NamedTuple):
+    latitude: float
+    longitude: float
+    radius_km: float
+
+
+class ListingFilters(NamedTuple):
+    """Normalized filters of the public listings feed (hashable, usable as a cache key)."""
+    search_text: str
+    owner_id: Optional[int]
+    city_id: Optional[int]
+    city_text: Optional[str]
+    type: Optional[str]
+    min_price: Optional[float]
+    max_price: Optional[float]
+    is_featured: Optional[bool]
+    near: Optional[GeoFilter]
+
+
+def _parse_near(near: Optional[str], radius_km: float) -> Optional[GeoFilter]:
+    """Parse near=lat,lon into a GeoFilter."""
+    if not near:
+        return None
+    try:
+        latitude, longitude = (float(part) for part in near.split(","))
+    except ValueError:
+        latitude = longitude = None
+    if latitude is None or not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="near must be 'latitude,longitude' in decimal degrees"
+        )
+    return GeoFilter(latitude, longitude, radius_km)
+
+
+def _listing_filters(
+    q: Optional[str],
+    owner_id: Optional[str],
+    city: Optional[str],
+    type: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    is_featured: Optional[bool],
+    near: Optional[str],
+    radius_km: float,
+    current_user: Optional[User]
+) -> ListingFilters:
+    """Validate and normalize the filter query parameters shared by the listings endpoints."""
+    
+    owner = None
+    if owner_id:
+        if owner_id == "me":
+            if not current_user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Authentication required to filter by 'me'"
+                )
+            owner = current_user.id
+        elif owner_id.isdigit():
+            owner = int(owner_id)
+    
+    city_id = city_index.resolve(city) if city else None
+    city_text = city.strip().lower() if city and city_id is None else None
+    
+    return ListingFilters(
+        search_text=normalize_search_text(q) if q else "",
+        owner_id=owner,
+        city_id=city_id,
+        city_text=city_text or None,
+        type=type.strip().lower() if type and type.strip() else None,
+        min_price=min_price,
+        max_price=max_price,
+        is_featured=is_featured,
+        near=_parse_near(near, radius_km)
+    )
+
+
+def _search_query(search_text: str):
+    return func.websearch_to_tsquery(SEARCH_CONFIG, search_text)
+
+
+def _apply_listing_filters(query, filters: ListingFilters):
+    """Restrict a query over listings to the public feed matching `filters`."""
+    
+    query = query.filter(Listing.status == ListingStatus.APPROVED)
+    
+    if filters.search_text:
+        query = query.filter(Listing.search_vector.op("@@")(_search_query(filters.search_text)))
+    
+    if filters.owner_id is not None:
+        query = query.filter(Listing.owner_id == filters.owner_id)
+    
+    if filters.city_id is not None:
+        query = query.filter(Listing.city_id == filters.city_id)
+    elif filters.city_text:
+        # Unknown spelling - fuzzy match served by the trigram index
+        query = query.filter(Listing.city.ilike(f"%{filters.city_text}%"))
+    
+    if filters.type:
+        query = query.filter(Listing.type.ilike(f"%{filters.type}%"))
+    
+    if filters.min_price is not None:
+        query = query.filter(Listing.price >= filters.min_price)
+    
+    if filters.max_price is not None:
+        query = query.filter(Listing.price <= filters.max_price)
+    
+    if filters.is_featured is not None:
+        query = query.filter(Listing.is_featured == filters.is_featured)
+    
+    if filters.near is not None:
+        origin = func.ll_to_earth(filters.near.latitude, filters.near.longitude)
+        radius_m = filters.near.radius_km * 1000
+        # The bounding cube is answered by the (partial) GiST index, earth_distance
+        # rechecks the circle
+        query = query.filter(
+            Listing.latitude.isnot(None),
+            Listing.longitude.isnot(None),
+            func.earth_box(origin, radius_m).op("@>")(_listing_earth_point()),
+            func.earth_distance(origin, _listing_earth_point()) <= radius_m
+        )
+    
+    return query
+
+
+def _order_listing_page(query, sort_order: SortOrder, after: Optional[List[Any]] = None):
+    """Order `query` by `sort_order`, resuming after the sort key values of a cursor if given."""
+    sort_keys = [key for key, _ in sort_order.keys]
+    
+    if after is not None:
+        if sort_order.descending:
+            query = query.filter(tuple_(*sort_keys) < tuple(after))
+        else:
+            query = query.filter(tuple_(*sort_keys) > tuple(after))
+    
+    return query.order_by(*[key.desc() if sort_order.descending else key.asc() for key in sort_keys])
+
+
+def _listing_earth_point():
+    # Same expression as the ix_listings_earth_point index
+    return func.ll_to_earth(Listing.latitude, Listing.longitude)
+
+
+def _distance_sort(near: GeoFilter) -> SortOrder:
+    """
+    Sort by distance from the near= point, nearest first.
+    
+    Uses the cube <-> operator (straight-line distance between earth points), which
+    the GiST index can answer as a nearest-neighbour scan. It is not the surface
+    distance but it orders points exactly the same way.
+    """
+    origin = func.ll_to_earth(near.latitude, near.longitude)
+    distance = _listing_earth_point().op("<->", return_type=Float)(origin)
+    return SortOrder(keys=((distance, float), (Listing.id, int)), descending=False)
+
+
+def _relevance_sort(search_text: str) -> SortOrder:
+    """Sort by ts_rank of the full-text match, boosting featured listings."""
+    rank = func.ts_rank(Listing.search_vector, _search_query(search_text)) * case(
+        (Listing.is_featured == True, FEATURED_RANK_BOOST),
+        else_=1.0
+    )
+    return SortOrder(keys=((rank, float), (Listing.id, int)), descending=True)
+
+
+# Total counts per normalized filter set: (count, mode the count was obtained with)
+listing_count_cache = register_cache(
+    "listing_counts",
+    MemoryCache(max_entries=2048, ttl=settings.LISTING_COUNT_CACHE_TTL_SECONDS)
+)
+
+
+def _estimate_rows(db: Session, query) -> Optional[int]:
+    """Planner row estimate of a query (Postgres only), without running it."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    return int(explain_plan(db, query)["Plan Rows"])
+
+
+def _listing_total(db: Session, filters: ListingFilters) -> Tuple[int, str]:
+    """
+    Total number of listings matching `filters` and how it was obtained.
+    
+    "cached" when a count for the same filters is cached; otherwise "exact" if the
+    planner expects at most LISTING_COUNT_EXACT_THRESHOLD rows (a cheap COUNT),
+    else "estimate" (the planner's row estimate, no scan at all).
+    """
+    cached = listing_count_cache.get(filters)
+    if cached is not None:
+        return cached[0], "cached"
+    
+    estimate = _estimate_rows(db, _apply_listing_filters(db.query(Listing.id), filters))
+    if estimate is not None and estimate > settings.LISTING_COUNT_EXACT_THRESHOLD:
+        total, mode = estimate, "estimate"
+    else:
+        total, mode = _apply_listing_filters(db.query(func.count(Listing.id)), filters).scalar(), "exact"
+    
+    listing_count_cache.set(filters, (total, mode))
+    return total, mode
+
+
 @router.get("/", response_model=List[ListingResponse])
 async def get_listings(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=200),
     city: Optional[str] = None,
     type: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     is_featured: Optional[bool] = None,
     owner_id: Optional[str] = None,
+    near: Optional[str] = Query(None, description="latitude,longitude"),
+    radius_km: float = Query(25, gt=0, le=MAX_RADIUS_KM),
+    with_total: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,title,price,city"),
+    include: Optional[str] = Query(None, description="images: embed each listing's images"),
     current_user: Optional[User] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
     """
     Get all kitchen listings with optional filtering.
     Use owner_id='me' to get only your own listings (requires authentication).
+    
+    Use q= to search title and description (Arabic and English); results are then
+    ranked by relevance unless another sort is requested.
+    
+    Use near=lat,lon (and radius_km, default 25) to keep listings within that radius;
+    results are then sorted by distance unless another sort is requested.
+    
+    Pagination: pass the X-Next-Cursor header of a page back as `cursor` to fetch
+    the next page in constant time. `skip` is still honoured when no cursor is given.
+    
+    with_total=true adds X-Total-Count (all matching listings, ignoring paging) and
+    X-Total-Count-Mode: exact, estimate or cached.
+    
+    fields=id,title,price,... returns (and reads from the database) only those fields.
+    
+    include=images embeds each listing's images (id, url), loaded for the whole page
+    in one extra query. cover_image_url is always available without it.
     """
     
-    query = db.query(Listing).filter(Listing.status == "active")
+    filters = _listing_filters(
+        q, owner_id, city, type, min_price, max_price, is_featured, near, radius_km, current_user
+    )
     
-    # Handle owner_id filter
-    if owner_id:
-        if owner_id == "me":
-            if not current_user:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Authentication required to filter by 'me'"
-                )
-            query = query.filter(Listing.owner_id == current_user.id)
-        elif owner_id.isdigit():
-            query = query.filter(Listing.owner_id == int(owner_id))
+    if sort is None:
+        if filters.near:
+            sort = "distance"
+        elif filters.search_text:
+            sort = "relevance"
+        else:
+            sort = "newest"
+    
+    if sort == "distance":
+        if not filters.near:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="sort=distance requires near=latitude,longitude"
+            )
+        sort_order = _distance_sort(filters.near)
+    elif sort == "relevance":
+        if not filters.search_text:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="sort=relevance requires a search query (q)"
+            )
+        sort_order = _relevance_sort(filters.search_text)
+    else:
+        sort_order = LISTING_SORTS.get(sort)
+        if sort_order is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid sort '{sort}'. Allowed values: relevance, distance, {', '.join(LISTING_SORTS)}"
+            )
+    
+    fieldset = _parse_fields(fields, LISTING_LIST_FIELDS, _parse_include(include))
+    
+    # The fast path selects plain column tuples instead of building ORM objects
+    fast_json = serialization.fast_json_enabled()
+    if fast_json:
+        entity_columns = fieldset.row_serializer.columns(Listing)
+        query = db.query(*entity_columns)
+    else:
+        entity_columns = [Listing]
+        query = db.query(Listing)
+        if fieldset.fields != tuple(ListingResponse.model_fields):
+            query = query.options(load_only(*[getattr(Listing, name) for name in fieldset.fields]))
+        if fieldset.with_images:
+            query = query.options(selectinload(Listing.images))
+    query = _apply_listing_filters(query, filters)
     
-    if city:
-        query = query.filter(Listing.city.ilike(f"%{city}%"))
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort, [parse for _, parse in sort_order.keys])
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    if type:
-        query = query.filter(Listing.type.ilike(f"%{type}%"))
+    query = _order_listing_page(query, sort_order, after)
     
-    if min_price is not None:
-        query = query.filter(Listing.price >= min_price)
+    if not cursor:
+        query = query.offset(skip)
     
-    if max_price is not None:
-        query = query.filter(Listing.price <= max_price)
+    # Fetch one extra row to know whether another page exists
+    rows = query.add_columns(*[key for key, _ in sort_order.keys]).limit(limit + 1).all()
     
-    if is_featured is not None:
-        query = query.filter(Listing.is_featured == is_featured)
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(sort, list(rows[-1][len(entity_columns):]))
     
-    listings = query.offset(skip).limit(limit).all()
+    if with_total:
+        if not rows and not cursor and skip == 0:
+            total, mode = 0, "exact"  # An empty first page is an exact count for free
+        else:
+            total, mode = _listing_total(db, filters)
+        headers["X-Total-Count"] = str(total)
+        headers["X-Total-Count-Mode"] = mode
     
-    return listings
+    if fast_json:
+        items = fieldset.row_serializer.to_dicts(rows)
+        if fieldset.with_images:
+            images = _listing_images(db, [item["id"] for item in items])
+            for item in items:
+                item["images"] = images[item["id"]]
+        payload = serialization.dumps(items)
+    else:
+        listings = fieldset.list_adapter.validate_python([row[0] for row in rows], from_attributes=True)
+        payload = fieldset.list_adapter.dump_json(listings)
+    return json_response_with_etag(request, payload, headers=headers)
 
 
-@router.get("/{listing_id}", response_model=ListingResponse)
-async def get_listing(listing_id: int, db: Session = Depends(get_db)):
-    """Get a specific listing by ID."""
+# Upper bounds (SAR, exclusive) of the price facet buckets; the last bucket is open-ended
+PRICE_BUCKET_BOUNDS = (5000, 10000, 20000, 40000)
+
+# Facet counts per normalized filter set, shared by all requests of this worker
+facets_cache = register_cache("facets", MemoryCache(max_entries=512, ttl=settings.FACETS_CACHE_TTL_SECONDS))
+
+
+def _compute_facets(db: Session, filters: ListingFilters) -> ListingFacetsResponse:
+    """Count matching listings per city, type, material and price bucket in one query."""
     
-    listing = db.query(Listing).filter(
-        Listing.id == listing_id,
-        Listing.status == "active"
-    ).first()
+    # Bounds are rendered as literals so the expression is textually identical in
+    # the select list and in GROUPING SETS
+    price_bucket = case(
+        *[
+            (Listing.price < literal_column(str(bound)), literal_column(str(index)))
+            for index, bound in enumerate(PRICE_BUCKET_BOUNDS)
+        ],
+        else_=literal_column(str(len(PRICE_BUCKET_BOUNDS)))
+    )
+    dimensions = (Listing.city_id, Listing.type, Listing.material, price_bucket)
     
-    if not listing:
+    query = db.query(
+        *dimensions,
+        func.count(Listing.id),
+        *[func.grouping(dimension) for dimension in dimensions]
+    )
+    query = _apply_listing_filters(query, filters).group_by(
+        func.grouping_sets(tuple_(), *[tuple_(dimension) for dimension in dimensions])
+    )
+    
+    total = 0
+    cities, types, materials = [], [], []
+    bucket_counts = {}
+    for city_id, type_, material, bucket, count, *grouped_out in query.all():
+        active = [index for index, flag in enumerate(grouped_out) if not flag]
+        if not active:
+            total = count
+        elif active == [0]:
+            city = city_index.get(city_id) if city_id is not None else None
+            cities.append(CityFacet(
+                city_id=city_id,
+                slug=city.slug if city else None,
+                name_ar=city.name_ar if city else None,
+                name_en=city.name_en if city else None,
+                count=count
+            ))
+        elif active == [1]:
+            types.append(ValueFacet(value=type_, count=count))
+        elif active == [2]:
+            materials.append(ValueFacet(value=material, count=count))
+        elif active == [3]:
+            bucket_counts[bucket] = count
+    
+    bounds = (0,) + PRICE_BUCKET_BOUNDS + (None,)
+    price_buckets = [
+        PriceBucketFacet(min_price=bounds[index], max_price=bounds[index + 1], count=bucket_counts.get(index, 0))
+        for index in range(len(PRICE_BUCKET_BOUNDS) + 1)
+    ]
+    
+    by_count = lambda facet: -facet.count
+    return ListingFacetsResponse(
+        total=total,
+        cities=sorted(cities, key=by_count),
+        types=sorted(types, key=by_count),
+        materials=sorted(materials, key=by_count),
+        price_buckets=price_buckets
+    )
+
+
+@router.get("/facets", response_model=ListingFacetsResponse)
+async def get_listing_facets(
+    q: Optional[str] = Query(None, max_length=200),
+    city: Optional[str] = None,
+    type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    is_featured: Optional[bool] = None,
+    owner_id: Optional[str] = None,
+    near: Optional[str] = Query(None, description="latitude,longitude"),
+    radius_km: float = Query(25, gt=0, le=MAX_RADIUS_KM),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db)
+):
+    """
+    Count listings per city, type, material and price bucket.
+    
+    Accepts the same filters as GET /api/v1/listings/ so the filter UI can show
+    only options that have results. Cached briefly per normalized filter set.
+    """
+    
+    filters = _listing_filters(
+        q, owner_id, city, type, min_price, max_price, is_featured, near, radius_km, current_user
+    )
+    
+    facets = facets_cache.get(filters)
+    if facets is None:
+        facets = _compute_facets(db, filters)
+        facets_cache.set(filters, facets)
+    
+    return facets
+
+
+LISTING_BATCH_MAX_IDS = 300
+
+
+def _parse_listing_ids(ids: str) -> List[int]:
+    try:
+        listing_ids = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Listing not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of integers"
+        )
+    if not listing_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must not be empty")
+    if len(listing_ids) > LISTING_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {LISTING_BATCH_MAX_IDS} ids per request"
         )
+    return listing_ids
+
+
+def _listing_id_in(db: Session, listing_ids: List[int]):
+    """
+    `id = ANY(:ids)` on PostgreSQL: a single array parameter, so every batch size
+    shares one statement and plan. Other databases get a plain IN list.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return Listing.id == any_(bindparam("listing_ids", listing_ids, type_=ARRAY(Integer)))
+    return Listing.id.in_(listing_ids)
+
+
+@router.get("/batch", response_model=ListingBatchResponse)
+async def get_listings_batch(
+    request: Request,
+    ids: str = Query(..., description=f"Comma-separated listing ids, at most {LISTING_BATCH_MAX_IDS}"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get many approved listings by id in one request.
     
-    return listing
+    Items come back in request order (duplicates included), each with found=false
+    and listing=null when the id does not exist or is not approved. Listings are
+    read from the listing cache first; the rest are loaded with a single query and
+    cached for the detail endpoint.
+    """
+    
+    listing_ids = _parse_listing_ids(ids)
+    unique_ids = list(dict.fromkeys(listing_ids))
+    
+    payloads = listing_cache.get_many(unique_ids)
+    misses = [listing_id for listing_id in unique_ids if listing_id not in payloads]
+    if misses:
+        listings = db.query(Listing).filter(
+            _listing_id_in(db, misses),
+            Listing.status == ListingStatus.APPROVED
+        ).all()
+        loaded = {
+            listing.id: ListingResponse.model_validate(listing).model_dump_json().encode("utf-8")
+            for listing in listings
+        }
+        listing_cache.set_many(loaded)
+        payloads.update(loaded)
+    
+    # Splice the cached ListingResponse JSON in as-is instead of re-validating it
+    items = [
+        b'{"id":%d,"found":true,"listing":%s}' % (listing_id, payloads[listing_id])
+        if listing_id in payloads else
+        b'{"id":%d,"found":false,"listing":null}' % listing_id
+        for listing_id in listing_ids
+    ]
+    missing = [listing_id for listing_id in unique_ids if listing_id not in payloads]
+    payload = b'{"items":[%s],"missing":%s}' % (b",".join(items), json.dumps(missing, separators=(",", ":")).encode())
+    return json_response_with_etag(request, payload)
+
+
+@router.get("/{listing_id}", response_model=ListingResponse)
+async def get_listing(
+    listing_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,title,price,city"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a specific listing by ID.
+    
+    Served from the listing cache when possible; write paths call invalidate_listing.
+    A matching If-None-Match on a cache hit returns 304 without touching the database.
+    
+    fields= trims the response. The full row is still read on a cache miss so the
+    cached payload can serve every field selection.
+    """
+    
+    fieldset = _parse_fields(fields, LISTING_DETAIL_FIELDS)
+    
+    payload = listing_cache.get(listing_id)
+    
+    if payload is None:
+        listing = db.query(Listing).filter(
+            Listing.id == listing_id,
+            Listing.status == ListingStatus.APPROVED
+        ).first()
+        
+        if not listing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Listing not found"
+            )
+        
+        payload = ListingResponse.model_validate(listing).model_dump_json().encode("utf-8")
+        listing_cache.set(listing_id, payload)
+    
+    if fieldset.model is not ListingResponse:
+        payload = fieldset.model.model_validate_json(payload).model_dump_json().encode("utf-8")
+    
+    return json_response_with_etag(request, payload)
+
+
+@router.get("/{listing_id}/similar", response_model=List[ListingResponse])
+async def get_similar_listings(
+    listing_id: int,
+    limit: int = Query(6, ge=1, le=12),
+    db: Session = Depends(get_db)
+):
+    """
+    Get listings similar to a listing (type, material, price, size, city).
+    
+    Neighbours are precomputed by build_similar_listings.py; this is a single
+    primary-key range lookup. Returns an empty list until the job has run.
+    """
+    
+    return db.query(Listing).join(
+        ListingSimilar, ListingSimilar.similar_listing_id == Listing.id
+    ).filter(
+        ListingSimilar.listing_id == listing_id,
+        Listing.status == ListingStatus.APPROVED
+    ).order_by(ListingSimilar.rank).limit(limit).all()
 
 
 @router.post("/", response_model=ListingResponse, status_code=status.HTTP_201_CREATED)
@@ -143,8 +858,9 @@ async def create_listing(
     
     new_listing = Listing(
         **listing_data.model_dump(),
+        city_id=city_index.resolve(listing_data.city),
         owner_id=current_user.id,
-        status="active"
+        status=ListingStatus.PENDING
     )
     
     db.add(new_listing)
@@ -156,6 +872,194 @@ async def create_listing(
     return new_listing
 
 
+# ============================================================================
+# Bulk import
+# ============================================================================
+
+BULK_IMPORT_FORMATS = ("csv", "jsonl")
+BULK_IMPORT_BATCH_SIZE = 2000
+BULK_IMPORT_MAX_ERRORS = 1000
+
+# Column order of the COPY stream; status is written by enum name, as SQLAlchemy stores it
+BULK_IMPORT_COLUMNS = (
+    "title", "description", "price", "city", "city_id", "type", "material",
+    "length_m", "width_m", "height_m", "latitude", "longitude", "status", "is_featured", "owner_id", "created_at", "updated_at"
+)
+
+
+def _bulk_import_format(format: Optional[str], upload: UploadFile) -> str:
+    """Pick the import format from ?format=, then the file extension, then the content type."""
+    if format:
+        format = format.lower()
+    else:
+        filename = (upload.filename or "").lower()
+        content_type = (upload.content_type or "").lower()
+        if filename.endswith(".csv") or "csv" in content_type:
+            format = "csv"
+        elif filename.endswith((".jsonl", ".ndjson")) or "ndjson" in content_type or "jsonl" in content_type:
+            format = "jsonl"
+    if format not in BULK_IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown import format. Use format= with one of: {', '.join(BULK_IMPORT_FORMATS)}"
+        )
+    return format
+
+
+def _iter_import_records(stream: io.TextIOBase, format: str) -> Iterator[Tuple[Any, Optional[str]]]:
+    """Yield (record, parse error) pairs one at a time, without reading the whole file."""
+    if format == "csv":
+        for record in csv.DictReader(stream):
+            # Empty cells mean "not provided" so optional fields validate as None
+            yield {key: value for key, value in record.items() if key and value not in (None, "")}, None
+        return
+    
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield None, "each line must be a JSON object"
+            continue
+        yield record, None
+
+
+def _copy_value(value: Any) -> str:
+    """Render a value for COPY's text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def _insert_listing_rows(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert a batch inside the session's transaction: COPY on Postgres, multi-row INSERT elsewhere."""
+    connection = db.connection()
+    if connection.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        for row in rows:
+            values = [row[column] for column in BULK_IMPORT_COLUMNS]
+            values[BULK_IMPORT_COLUMNS.index("status")] = row["status"].name
+            buffer.write("\t".join(_copy_value(value) for value in values))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY listings ({', '.join(BULK_IMPORT_COLUMNS)}) FROM STDIN", buffer)
+        finally:
+            cursor.close()
+    else:
+        db.execute(insert(Listing), rows)
+
+
+@router.post("/bulk", response_model=BulkImportResponse)
+def bulk_import_listings(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or jsonl; guessed from the file name if omitted"),
+    all_or_nothing: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Import many listings for the current user from a CSV (with a header row) or
+    JSON Lines file. Each record is validated like POST /api/v1/listings/ and all
+    valid records are inserted in one transaction; invalid ones are reported per row.
+    With all_or_nothing=true nothing is imported if any record is invalid.
+    
+    Declared as a plain function so the parsing and COPY run in the threadpool
+    instead of blocking the event loop.
+    """
+    
+    format = _bulk_import_format(format, file)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="" if format == "csv" else None)
+    
+    now = datetime.utcnow()
+    batch: List[Dict[str, Any]] = []
+    errors: List[BulkImportRowError] = []
+    total_rows = imported = failed = 0
+    
+    try:
+        try:
+            for total_rows, (record, parse_error) in enumerate(_iter_import_records(stream, format), start=1):
+                if total_rows > settings.BULK_IMPORT_MAX_ROWS:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Too many rows; at most {settings.BULK_IMPORT_MAX_ROWS} listings per import"
+                    )
+                
+                row_errors = [parse_error] if parse_error else []
+                if not row_errors:
+                    try:
+                        listing_data = ListingCreate.model_validate(record)
+                    except ValidationError as e:
+                        row_errors = [
+                            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                            for error in e.errors()
+                        ]
+                
+                if row_errors:
+                    failed += 1
+                    if len(errors) < BULK_IMPORT_MAX_ERRORS:
+                        errors.append(BulkImportRowError(row=total_rows, errors=row_errors))
+                    continue
+                
+                if all_or_nothing and failed:
+                    continue  # Keep validating to report every error, but stop inserting
+                
+                batch.append({
+                    **listing_data.model_dump(),
+                    "city_id": city_index.resolve(listing_data.city),
+                    "status": ListingStatus.PENDING,
+                    "is_featured": False,
+                    "owner_id": current_user.id,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+                if len(batch) >= BULK_IMPORT_BATCH_SIZE:
+                    _insert_listing_rows(db, batch)
+                    imported += len(batch)
+                    batch = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not read the import file near row {total_rows + 1}: {e}"
+            )
+        
+        if all_or_nothing and failed:
+            db.rollback()
+            imported = 0
+        else:
+            if batch:
+                _insert_listing_rows(db, batch)
+                imported += len(batch)
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    logger.info(
+        f"📦 Bulk import by user {current_user.id}: {imported} imported, {failed} failed of {total_rows} rows"
+    )
+    
+    return BulkImportResponse(
+        total_rows=total_rows,
+        imported=imported,
+        failed=failed,
+        errors=errors,
+        errors_truncated=failed > len(errors)
+    )
+
+
 @router.put("/{listing_id}", response_model=ListingResponse)
 async def update_listing(
     listing_id: int,
@@ -185,10 +1089,14 @@ async def update_listing(
     for field, value in update_data.items():
         setattr(listing, field, value)
     
+    if "city" in update_data:
+        listing.city_id = city_index.resolve(listing.city)
+    
     listing.updated_at = datetime.utcnow()
     
     db.commit()
     db.refresh(listing)
+    invalidate_listing(listing_id)
     
     logger.info(f"✅ Listing updated: ID {listing_id} by user {current_user.id}")
     
@@ -219,10 +1127,11 @@ async def delete_listing(
         )
     
     # Soft delete - mark as inactive
-    listing.status = "inactive"
+    listing.status = ListingStatus.INACTIVE
     listing.updated_at = datetime.utcnow()
     
     db.commit()
+    invalidate_listing(listing_id)
     
     logger.info(f"🗑️ Listing soft-deleted: ID {listing_id} by user {current_user.id}")
     
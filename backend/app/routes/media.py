@@ -0,0 +1,80 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from pathlib import PurePosixPath
+from typing import Optional
+import logging
+
+from app.core.file_responses import serve_file
+from app.core.storage import storage
+from app.services.image_processing import ImageProcessingError
+from app.services.image_resize import RESIZE_SIZES, resized_image
+
+
+router = APIRouter(prefix="/media", tags=["media"])
+logger = logging.getLogger("kitchentech")
+
+RESIZABLE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def _media_key(path: str) -> Optional[str]:
+    """
+    The storage key of a media URL path, if it may be served. Hidden names
+    (such as uploads still being staged) and parent references are not.
+    """
+    parts = PurePosixPath(path).parts
+    if not parts or any(part.startswith(".") or part == "/" for part in parts):
+        return None
+    return "/".join(parts)
+
+
+# ============================================================================
+# Media Routes
+# ============================================================================
+
+@router.get("/resize/{width}x{height}/{path:path}")
+async def get_resized_image(width: int, height: int, path: str, request: Request):
+    """
+    Serve a media image scaled to fit within width x height, as WebP.
+    
+    Width and height must each be one of RESIZE_SIZES. Images are never
+    enlarged. Results are kept in a size-capped disk cache
+    (MEDIA_RESIZE_CACHE_DIR), so only the first request for a size resizes.
+    Works with any storage backend; remote sources are fetched on a cache miss.
+    """
+    
+    if width not in RESIZE_SIZES or height not in RESIZE_SIZES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Width and height must each be one of {', '.join(map(str, RESIZE_SIZES))}"
+        )
+    
+    key = _media_key(path)
+    if key is None or PurePosixPath(key).suffix.lower() not in RESIZABLE_EXTENSIONS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    
+    try:
+        resized = await resized_image(key, width, height)
+    except ImageProcessingError as e:
+        logger.warning(f"❌ Cannot resize {path}: {e}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    if resized is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    
+    return await serve_file(request, resized, media_type="image/webp")
+
+
+@router.api_route("/{path:path}", methods=["GET", "HEAD"])
+async def get_media_file(path: str, request: Request):
+    """
+    Serve an uploaded file from local storage.
+    
+    Upload paths are never reused for other content, so files may be cached by
+    clients indefinitely (Cache-Control: immutable), with strong ETags and
+    byte-range support. In production nginx serves /media/ directly; see
+    deploy/nginx and MEDIA_ACCEL_REDIRECT_PREFIX. With the s3 backend, MEDIA_URL
+    points clients at the bucket instead and this route finds nothing.
+    """
+    key = _media_key(path)
+    source = storage.local_path(key) if key else None
+    if source is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    return await serve_file(request, source)
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
@@ -7,6 +8,7 @@ from datetime import datetime, timedelta
 from app.database import get_db
 from app.models import Plan, PlanType, Subscription, SubscriptionStatus, PaymentStatus, User
 from app.routes.auth import get_current_user
+from app.core.etag import make_etag, etag_matches, not_modified, REVALIDATE_CACHE_CONTROL
 
 
 router = APIRouter(prefix="/api/plans", tags=["plans"])
@@ -59,10 +61,23 @@ class SubscriptionResponse(BaseModel):
 
 @router.get("/", response_model=List[PlanResponse])
 async def get_plans(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    """Get all active subscription plans."""
+    """Get all active subscription plans (supports If-None-Match)."""
+    
+    # Validate against a cheap version aggregate before loading the rows
+    count, last_update = db.query(func.count(Plan.id), func.max(Plan.updated_at)).filter(
+        Plan.is_active == True
+    ).one()
+    etag = make_etag("plans", count, last_update)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     plans = db.query(Plan).filter(Plan.is_active == True).all()
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
     return plans
 
 
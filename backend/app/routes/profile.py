@@ -5,8 +5,10 @@ from pydantic import BaseModel, EmailStr
 from datetime import datetime
 
 from app.database import get_db
-from app.models import User, UserRole, Listing
+from app.models import User, UserRole, Listing, ListingImage
 from app.routes.auth import get_current_user
+from app.core.cache import invalidate_listing
+from app.services.media_blobs import release_image
 
 
 router = APIRouter(prefix="/api/profile", tags=["profile"])
@@ -117,10 +119,24 @@ async def delete_my_account(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Delete current user's account."""
+    """Delete current user's account, with its listings and their images."""
+    
+    listing_ids = [
+        listing_id for (listing_id,) in db.query(Listing.id).filter(Listing.owner_id == current_user.id)
+    ]
+    
+    # The ORM cascade would delete the image rows without releasing their shared
+    # files; blobs are released in sha256 order, the order uploads lock them in
+    images = db.query(ListingImage).filter(
+        ListingImage.listing_id.in_(listing_ids)
+    ).order_by(ListingImage.blob_sha256, ListingImage.id).all() if listing_ids else []
+    for image in images:
+        await release_image(db, image)
     
     # In production, you might want to soft delete or archive the account
     db.delete(current_user)
     db.commit()
+    for listing_id in listing_ids:
+        invalidate_listing(listing_id)
     
     return {"message": "Account deleted successfully"}
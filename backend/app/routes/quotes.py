@@ -10,6 +10,7 @@ from app.database import get_db
 from app.models import QuoteRequest, KitchenStyle, QuoteRequestStatus
 from app.models.user import User, UserRole
 from app.core.security import get_current_user
+from app.core.cities import city_index
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
@@ -58,16 +59,14 @@ class QuoteRequestCreate(BaseModel):
     
     @validator('city')
     def validate_city(cls, v):
-        """Validate and normalize city name."""
-        # Allowed cities
-        valid_cities = ['riyadh', 'jeddah', 'dammam', 'khobar', 'other']
-        city_lower = v.lower().strip()
+        """Normalize city name to its canonical slug (Arabic or English input)."""
+        city_id = city_index.resolve(v)
         
-        if city_lower not in valid_cities:
-            # If not in predefined list, accept but mark as 'other'
+        if city_id is None:
+            # If not a known city, accept but mark as 'other'
             return 'other'
         
-        return city_lower
+        return city_index.get(city_id).slug
 
 
 class QuoteRequestResponse(BaseModel):
@@ -115,7 +114,7 @@ async def create_quote_request(
     
     **Request Body**:
     - style: Kitchen style (modern, classic, wood, aluminum)
-    - city: City name (riyadh, jeddah, dammam, khobar, other)
+    - city: City name in Arabic or English (stored as its slug, e.g. riyadh, or 'other')
     - phone: Saudi phone number (10 digits, starts with 05)
     
     **Returns**: Created quote request with ID and timestamp
@@ -140,6 +139,7 @@ async def create_quote_request(
     db_quote = QuoteRequest(
         style=quote.style,
         city=quote.city,
+        city_id=city_index.resolve(quote.city),
         phone=quote.phone,
         status=QuoteRequestStatus.NEW
     )
@@ -184,7 +184,11 @@ async def get_quote_requests(
         query = query.filter(QuoteRequest.status == status_filter)
     
     if city_filter:
-        query = query.filter(QuoteRequest.city == city_filter.lower())
+        city_id = city_index.resolve(city_filter)
+        if city_id is not None:
+            query = query.filter(QuoteRequest.city_id == city_id)
+        else:
+            query = query.filter(QuoteRequest.city == city_filter.lower())
     
     if style_filter:
         query = query.filter(QuoteRequest.style == style_filter)
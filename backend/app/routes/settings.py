@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
@@ -7,6 +8,7 @@ from app.database import get_db
 from app.models import SiteSetting
 from app.routes.auth import get_current_user
 from app.models.user import User, UserRole
+from app.core.etag import make_etag, etag_matches, not_modified, REVALIDATE_CACHE_CONTROL
 
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
@@ -36,10 +38,23 @@ class SettingUpdate(BaseModel):
 
 @router.get("/public", response_model=List[SettingResponse])
 async def get_public_settings(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    """Get all public settings (accessible without authentication)."""
+    """Get all public settings (accessible without authentication, supports If-None-Match)."""
+    
+    # Validate against a cheap version aggregate before loading the rows
+    count, last_id, last_update = db.query(
+        func.count(SiteSetting.id), func.max(SiteSetting.id), func.max(SiteSetting.updated_at)
+    ).filter(SiteSetting.is_public == True).one()
+    etag = make_etag("public-settings", count, last_id, last_update)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     settings = db.query(SiteSetting).filter(SiteSetting.is_public == True).all()
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
     return settings
 
 
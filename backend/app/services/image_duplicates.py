@@ -0,0 +1,136 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models.listing import Listing
+from app.models.listing_image import ListingImage
+
+logger = logging.getLogger("kitchentech")
+
+# Hamming distance (of 64 bits) up to which two dHashes count as the same photo
+NEAR_DUPLICATE_MAX_DISTANCE = 10
+
+# catch_up() re-reads rows updated this long before the newest one it has seen, since
+# updated_at is set at flush time and a transaction may commit later than another
+CATCH_UP_OVERLAP = timedelta(minutes=5)
+
+# Set bits of every byte value
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+class HashMatch(NamedTuple):
+    image_id: int
+    listing_id: int
+    owner_id: int
+    distance: int
+
+
+class _HashState(NamedTuple):
+    hashes: np.ndarray  # uint64
+    image_ids: np.ndarray  # int64, ascending
+    listing_ids: np.ndarray
+    owner_ids: np.ndarray
+
+
+def hamming_distances(hashes: np.ndarray, value: int) -> np.ndarray:
+    """Hamming distance from `value` to every uint64 in `hashes`, via a byte popcount table."""
+    xor = np.bitwise_xor(hashes, np.uint64(value & 0xFFFFFFFFFFFFFFFF))
+    return _POPCOUNT[xor.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.uint8)
+
+
+class ImageHashIndex:
+    """
+    In-memory perceptual hashes of all listing images, for near-duplicate lookups.
+
+    A lookup is one vectorized XOR + popcount pass over a uint64 array, a few
+    milliseconds per 100k images. load() reads every hash; catch_up() merges
+    images uploaded or updated since (by any worker, or build_image_variants.py
+    filling in hashes of older images) with one query on updated_at. Deleted
+    images stay in the arrays until the next load(), so callers re-read matched
+    images from the database.
+    """
+
+    def __init__(self):
+        empty = np.zeros(0, dtype=np.int64)
+        self._state = _HashState(empty.view(np.uint64), empty, empty, empty)
+        self._watermark: Optional[datetime] = None  # Newest updated_at seen
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._state.image_ids)
+
+    def _query_rows(self, db: Session, updated_after: Optional[datetime]):
+        query = db.query(
+            ListingImage.id, ListingImage.listing_id, Listing.owner_id, ListingImage.dhash, ListingImage.updated_at
+        ).join(
+            Listing, Listing.id == ListingImage.listing_id
+        ).filter(
+            ListingImage.dhash.isnot(None)
+        )
+        if updated_after is not None:
+            query = query.filter(ListingImage.updated_at > updated_after)
+        return query.order_by(ListingImage.id).all()
+
+    @staticmethod
+    def _to_state(rows) -> _HashState:
+        columns = list(zip(*rows)) if rows else [(), (), (), ()]
+        return _HashState(
+            np.array(columns[3], dtype=np.int64).view(np.uint64),
+            np.array(columns[0], dtype=np.int64),
+            np.array(columns[1], dtype=np.int64),
+            np.array(columns[2], dtype=np.int64),
+        )
+
+    @staticmethod
+    def _newest(rows, watermark: Optional[datetime]) -> Optional[datetime]:
+        return max((row[4] for row in rows if row[4] is not None), default=watermark)
+
+    def load(self, db: Session) -> None:
+        rows = self._query_rows(db, None)
+        state = self._to_state(rows)
+        with self._lock:
+            self._state = state
+            self._watermark = self._newest(rows, None)
+        logger.info(f"🧬 Image hash index loaded: {len(state.image_ids)} images")
+
+    def catch_up(self, db: Session) -> None:
+        watermark = self._watermark
+        rows = self._query_rows(db, watermark - CATCH_UP_OVERLAP if watermark else None)
+        if not rows:
+            return
+        new = self._to_state(rows)
+        with self._lock:
+            state = self._state
+            # Rows of the overlap window (or merged by another request meanwhile) are
+            # usually indexed already, unchanged
+            if len(state.image_ids):
+                position = np.minimum(np.searchsorted(state.image_ids, new.image_ids), len(state.image_ids) - 1)
+                unchanged = (state.image_ids[position] == new.image_ids) & (state.hashes[position] == new.hashes)
+            else:
+                unchanged = np.zeros(len(new.image_ids), dtype=bool)
+            self._watermark = self._newest(rows, self._watermark)
+            if unchanged.all():
+                return
+            changed = ~unchanged
+            kept = ~np.isin(state.image_ids, new.image_ids[changed])
+            merged = [np.concatenate((old[kept], added[changed])) for old, added in zip(state, new)]
+            order = np.argsort(merged[1], kind="stable")
+            self._state = _HashState(*(column[order] for column in merged))
+
+    def near(self, value: int, max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE) -> List[HashMatch]:
+        """Indexed images whose hash is within `max_distance` of `value`, closest first."""
+        state = self._state
+        if not len(state.image_ids):
+            return []
+        distances = hamming_distances(state.hashes, value)
+        found = np.flatnonzero(distances <= max_distance)
+        found = found[np.argsort(distances[found], kind="stable")]
+        return [
+            HashMatch(int(state.image_ids[i]), int(state.listing_ids[i]), int(state.owner_ids[i]), int(distances[i]))
+            for i in found
+        ]
+
+
+image_hash_index = ImageHashIndex()
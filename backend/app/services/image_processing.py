@@ -0,0 +1,231 @@
+import asyncio
+import base64
+import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageOps
+from app.core.config import settings
+
+# Widths (px) of the WebP derivatives made for every upload; never wider than the original
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+WEBP_QUALITY = 80
+
+EXIF_ORIENTATION = 0x0112
+
+# Placeholders shown while an image loads: a BlurHash of this many components
+# (x, y) and a tiny inline WebP this many pixels on its longer side
+BLURHASH_COMPONENTS = (4, 3)
+PREVIEW_SIZE = 16
+PREVIEW_WEBP_QUALITY = 40
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+class ImageProcessingError(ValueError):
+    pass
+
+
+class ProcessedImage(NamedTuple):
+    width: int  # Original size, after EXIF rotation
+    height: int
+    variants: List[Dict[str, int]]  # {"filename", "width", "height"}, smallest first
+    dhash: int  # Perceptual hash, see difference_hash
+    blurhash: str
+    preview: str  # data: URI of a PREVIEW_SIZE px WebP
+
+
+def difference_hash(image: Image.Image) -> int:
+    """
+    64-bit dHash: one bit per horizontally adjacent pixel pair of a 9x8 grayscale
+    thumbnail (left brighter than right). Re-encoding, resizing and small edits
+    flip few bits, so near-duplicates are a small Hamming distance apart.
+    Returned as a signed 64-bit integer, to fit a BIGINT column.
+    """
+    pixels = image.convert("L").resize((9, 8), Image.Resampling.BOX).tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _base83(value: int, length: int) -> str:
+    return "".join(_BASE83[(value // 83 ** (length - 1 - i)) % 83] for i in range(length))
+
+
+def _srgb_to_linear(values: np.ndarray) -> np.ndarray:
+    values = values / 255.0
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(value: float) -> int:
+    value = min(max(value, 0.0), 1.0)
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash(image: Image.Image, components: Tuple[int, int] = BLURHASH_COMPONENTS) -> str:
+    """
+    BlurHash (https://blurha.sh) of `image`: a few DCT components in base83, which
+    clients decode into a blurred placeholder. Computed on a 32 px thumbnail with
+    numpy; the result is the same as for the full-size image, give or take
+    rounding.
+    """
+    x_components, y_components = components
+    thumbnail = image.convert("RGB")
+    thumbnail.thumbnail((32, 32), Image.Resampling.BOX)
+    pixels = _srgb_to_linear(np.asarray(thumbnail, dtype=np.float64))
+    height, width = pixels.shape[:2]
+
+    basis_x = np.cos(np.pi * np.outer(np.arange(x_components), np.arange(width)) / width)
+    basis_y = np.cos(np.pi * np.outer(np.arange(y_components), np.arange(height)) / height)
+    factors = np.einsum("jy,ix,yxc->jic", basis_y, basis_x, pixels) / (width * height)
+    factors[1:, :] *= 2
+    factors[0, 1:] *= 2
+    factors = factors.reshape(-1, 3)
+    dc, ac = factors[0], factors[1:]
+
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+    if len(ac):
+        quantised_max = int(max(0, min(82, np.floor(np.abs(ac).max() * 166 - 0.5))))
+        maximum = (quantised_max + 1) / 166
+        result += _base83(quantised_max, 1)
+    else:
+        maximum = 1.0
+        result += _base83(0, 1)
+    result += _base83((_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4)
+
+    scaled = ac / maximum
+    quantised = np.clip(np.floor(np.sign(scaled) * np.abs(scaled) ** 0.5 * 9 + 9.5), 0, 18).astype(int)
+    for r, g, b in quantised:
+        result += _base83(r * 19 * 19 + g * 19 + b, 2)
+    return result
+
+
+def preview_data_uri(image: Image.Image) -> str:
+    """The image shrunk to PREVIEW_SIZE px on its longer side, as an inline WebP data: URI."""
+    preview = image.copy()
+    preview.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    preview.save(buffer, "WEBP", quality=PREVIEW_WEBP_QUALITY)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def _open_oriented(source: str, min_size: int) -> Tuple[Image.Image, int, int]:
+    """
+    Decode `source` upright (EXIF rotation applied), as RGB or RGBA.
+
+    JPEGs are decoded at a reduced scale when the result still has both sides
+    of at least `min_size` pixels. Also returns the full-size upright dimensions.
+    """
+    with Image.open(source) as original:
+        width, height = original.size
+        if original.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+            width, height = height, width
+        original.draft("RGB", (min_size, min_size))
+        image = ImageOps.exif_transpose(original)
+
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    return image, width, height
+
+
+def render_variants(source: str, stem: str, output_dir: Optional[str] = None) -> ProcessedImage:
+    """
+    Decode `source` and write its WebP derivatives as {stem}_{width}w.webp into
+    `output_dir` (default: next to the source).
+
+    Runs in a worker process. Each variant is resized from the previous (larger)
+    one, and JPEGs are decoded at a reduced scale when that still covers the
+    largest variant. Also computes the image's difference_hash and its
+    placeholders (blurhash, preview_data_uri) from the smallest variant. Raises
+    ImageProcessingError for anything Pillow can't read; files written before
+    the failure are removed.
+    """
+    output_dir = Path(output_dir) if output_dir else Path(source).parent
+    written: List[Path] = []
+    try:
+        image, width, height = _open_oriented(source, max(IMAGE_VARIANT_WIDTHS))
+        dhash = difference_hash(image)
+
+        variants = []
+        for target in sorted(IMAGE_VARIANT_WIDTHS, reverse=True):
+            if target >= width:
+                continue
+            image = image.resize((target, max(1, round(height * target / width))), Image.Resampling.LANCZOS)
+            path = output_dir / f"{stem}_{target}w.webp"
+            image.save(path, "WEBP", quality=WEBP_QUALITY, method=4)
+            written.append(path)
+            variants.append({"filename": path.name, "width": image.width, "height": image.height})
+        placeholder_hash = blurhash(image)
+        preview = preview_data_uri(image)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        for path in written:
+            path.unlink(missing_ok=True)
+        raise ImageProcessingError(f"Unreadable image: {e}")
+
+    return ProcessedImage(width, height, variants[::-1], dhash, placeholder_hash, preview)
+
+
+def render_resized(source: str, destination: str, width: int, height: int) -> None:
+    """
+    Write `source` scaled to fit within width x height (never enlarged) as WebP.
+
+    Runs in a worker process. The file appears at `destination` atomically.
+    Raises ImageProcessingError for anything Pillow can't read.
+    """
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(destination), prefix=".resize-")
+    os.close(fd)
+    try:
+        image, _, _ = _open_oriented(source, max(width, height))
+        image.thumbnail((width, height), Image.Resampling.LANCZOS)
+        image.save(temp_name, "WEBP", quality=WEBP_QUALITY, method=4)
+        os.replace(temp_name, destination)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(f"Unreadable image: {e}")
+    finally:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def image_pool() -> ProcessPoolExecutor:
+    """Worker processes for Pillow work, started on first use."""
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the API process has threads (to_thread, thread pools) by now
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+async def process_image(source: Path, stem: str, output_dir: Optional[Path] = None) -> ProcessedImage:
+    """render_variants in the worker pool, without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        image_pool(), render_variants, str(source), stem, str(output_dir) if output_dir else None
+    )
+
+
+async def resize_image(source: Path, destination: Path, width: int, height: int) -> None:
+    """render_resized in the worker pool, without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(image_pool(), render_resized, str(source), str(destination), width, height)
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+from app.core.cache import DiskLRUCache, register_cache
+from app.core.config import settings
+from app.core.storage import StoredObject, storage
+from app.core.uploads import run_io
+from app.services.image_processing import resize_image
+
+logger = logging.getLogger("kitchentech")
+
+# Bump to invalidate every cached resize after changing how they are rendered
+RESIZE_VERSION = 1
+
+# Box sides (px) a resize may ask for. A fixed set keeps the number of cache
+# entries per image bounded, so clients can't churn the cache with arbitrary sizes.
+RESIZE_SIZES = (160, 320, 640, 1280)
+
+resize_cache = register_cache(
+    "media_resize",
+    DiskLRUCache(Path(settings.MEDIA_RESIZE_CACHE_DIR), settings.MEDIA_RESIZE_CACHE_MAX_MB * 1024 * 1024)
+)
+
+# Resizes in progress in this process, so concurrent requests for one variant share it
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+def resize_key(key: str, source: StoredObject, width: int, height: int) -> str:
+    """
+    Cache key of a resize. Uploads are never modified in place, so the storage
+    key plus the stored size and version identify its content without hashing it.
+    """
+    identity = f"{RESIZE_VERSION}|{key}|{source.size}|{source.version}|{width}x{height}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest() + ".webp"
+
+
+async def _render(cache_key: str, key: str, width: int, height: int) -> Path:
+    destination = resize_cache.path_for(cache_key)
+    await run_io(destination.parent.mkdir, parents=True, exist_ok=True)
+    source = storage.local_path(key)
+    if source is not None:
+        await resize_image(source, destination, width, height)
+    else:
+        # Remote storage: fetch the original next to the cache entry, then drop it
+        fd, temp_name = await run_io(tempfile.mkstemp, dir=destination.parent, prefix=".source-")
+        os.close(fd)
+        try:
+            await storage.download(key, Path(temp_name))
+            await resize_image(Path(temp_name), destination, width, height)
+        finally:
+            await run_io(Path(temp_name).unlink, missing_ok=True)
+    # May evict (unlink) other entries
+    await run_io(resize_cache.add, cache_key)
+    logger.info(f"🖼️  Resized {key} to fit {width}x{height}")
+    return destination
+
+
+async def resized_image(key: str, width: int, height: int) -> Optional[Path]:
+    """
+    Path of stored file `key` scaled to fit width x height, rendering it on a
+    cache miss; None if there is no such file. The disk cache is only touched
+    off the event loop (run_io).
+
+    Concurrent misses for the same variant wait for a single render, which is
+    shielded so a disconnecting client doesn't cancel it for the others. Raises
+    ImageProcessingError if the source can't be decoded.
+    """
+    source = await storage.stat(key)
+    if source is None:
+        return None
+    cache_key = resize_key(key, source, width, height)
+    cached = await run_io(resize_cache.get, cache_key)
+    if cached is not None:
+        return cached
+
+    future = _in_flight.get(cache_key)
+    if future is None:
+        future = asyncio.ensure_future(_render(cache_key, key, width, height))
+        _in_flight[cache_key] = future
+        future.add_done_callback(lambda _: _in_flight.pop(cache_key, None))
+    return await asyncio.shield(future)
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.storage import storage
+from app.models.listing_image import ListingImage
+from app.models.media_blob import MediaBlob
+from app.services.image_processing import ProcessedImage
+
+logger = logging.getLogger("kitchentech")
+
+# Local scratch space: uploads are streamed and processed here before going to storage.
+# Inside the media root, so the local backend stores them with a rename; hidden, so
+# they are never served.
+UPLOAD_STAGING_DIR = Path(settings.MEDIA_ROOT) / ".staging"
+UPLOAD_STAGING_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def blob_path(sha256: str, extension: str) -> str:
+    """Content-addressed location, fanned out over two directory levels."""
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def acquire_blob(db: Session, sha256: str, extension: str, size: int) -> MediaBlob:
+    """
+    Add a reference to the blob with this content, creating its row on first use.
+
+    The upsert locks the row until the transaction ends, so a concurrent
+    release_blob of the last reference either finishes first (and this upload
+    then stores the file again) or waits for this one. Waiting for that lock
+    blocks: async callers go through acquire_blobs in a thread.
+    """
+    insert = _insert(db)
+    db.execute(
+        insert(MediaBlob).values(
+            sha256=sha256, path=blob_path(sha256, extension), size=size, ref_count=1, created_at=datetime.utcnow()
+        ).on_conflict_do_update(
+            index_elements=[MediaBlob.sha256],
+            set_={"ref_count": MediaBlob.ref_count + 1}
+        )
+    )
+    return db.query(MediaBlob).populate_existing().filter(MediaBlob.sha256 == sha256).one()
+
+
+def acquire_blobs(db: Session, contents: List[Tuple[str, str, int]]) -> List[MediaBlob]:
+    """
+    acquire_blob for each (sha256, extension, size), returning the blobs in that
+    order. Rows are locked in sha256 order, so concurrent uploads sharing
+    contents can't deadlock each other. Run it with asyncio.to_thread: another
+    transaction's lock must never be waited for on the event loop.
+    """
+    blobs = {}
+    for sha256, extension, size in sorted(contents, key=lambda content: content[0]):
+        blobs.setdefault(sha256, []).append(acquire_blob(db, sha256, extension, size))
+    return [blobs[sha256].pop(0) for sha256, _, _ in contents]
+
+
+def blob_needs_processing(blob: MediaBlob) -> bool:
+    """True for blobs stored before every field of set_blob_variants existed."""
+    return blob.width is None or blob.dhash is None or blob.blurhash is None
+
+
+def set_blob_hashes(blob: MediaBlob, processed: ProcessedImage) -> None:
+    """The columns computed from the image content, without touching its derivatives."""
+    blob.dhash = processed.dhash
+    blob.blurhash = processed.blurhash
+    blob.preview = processed.preview
+
+
+def set_blob_variants(blob: MediaBlob, processed: ProcessedImage) -> None:
+    directory = blob.path.rsplit("/", 1)[0]
+    blob.width = processed.width
+    blob.height = processed.height
+    set_blob_hashes(blob, processed)
+    blob.variants = [
+        {"path": f"{directory}/{variant['filename']}", "width": variant["width"], "height": variant["height"]}
+        for variant in processed.variants
+    ]
+
+
+async def store_blob_variants(blob: MediaBlob, directory: Path) -> List[str]:
+    """
+    Move the derivatives of `blob`, rendered into the local `directory`, to
+    storage where they are missing. Returns the keys written; files already
+    there may be used by other images and are left alone.
+    """
+    keys = []
+    for variant in blob.variants or []:
+        if await storage.stat(variant["path"]) is not None:
+            continue
+        await storage.save(variant["path"], directory / variant["path"].rsplit("/", 1)[-1])
+        keys.append(variant["path"])
+    return keys
+
+
+def blob_keys(blob: MediaBlob) -> List[str]:
+    return [blob.path, *(variant["path"] for variant in blob.variants or [])]
+
+
+def blob_image_fields(blob: MediaBlob) -> Dict[str, Any]:
+    """ListingImage column values for an image stored as `blob`."""
+    return {
+        "blob_sha256": blob.sha256,
+        "url": storage.url(blob.path),
+        "filename": blob.path.rsplit("/", 1)[-1],
+        "width": blob.width,
+        "height": blob.height,
+        "dhash": blob.dhash,
+        "blurhash": blob.blurhash,
+        "preview": blob.preview,
+        "variants": [
+            {"url": storage.url(variant["path"]), "width": variant["width"], "height": variant["height"]}
+            for variant in blob.variants or []
+        ],
+    }
+
+
+def _release_blob_row(db: Session, sha256: str) -> Optional[MediaBlob]:
+    """Decrement the reference count under a row lock; returns the blob if that deleted its row."""
+    db.flush()
+    blob = db.query(MediaBlob).filter(MediaBlob.sha256 == sha256).with_for_update().one_or_none()
+    if blob is None:
+        return None
+    blob.ref_count -= 1
+    if blob.ref_count > 0:
+        return None
+    db.delete(blob)
+    db.flush()
+    return blob
+
+
+async def release_blob(db: Session, sha256: str) -> None:
+    """
+    Drop a reference to a blob; the last one deletes the row and its files.
+
+    Flushes first so a pending ListingImage delete is applied before the count.
+    The row lock is waited for in a thread, never on the event loop. Files are
+    deleted while it is held, before the caller commits, so a concurrent
+    acquire_blob can't pick up a blob whose file is going away.
+    """
+    blob = await asyncio.to_thread(_release_blob_row, db, sha256)
+    if blob is None:
+        return
+    await storage.delete(blob_keys(blob))
+    logger.info(f"🗑️ Media blob deleted: {blob.path}")
+
+
+async def release_image(db: Session, image: ListingImage) -> None:
+    """Delete an image row (pending until the caller commits) and release its files."""
+    db.delete(image)
+    if image.blob_sha256:
+        await release_blob(db, image.blob_sha256)
+        return
+    # Legacy per-listing file and its derivatives
+    directory = f"listings/{image.listing_id}"
+    await storage.delete(
+        f"{directory}/{filename}"
+        for filename in [image.filename, *(Path(variant["url"]).name for variant in image.variants or [])]
+    )
+    logger.info(f"🗑️ Image files deleted: {directory}/{image.filename}")
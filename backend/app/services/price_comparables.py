@@ -0,0 +1,208 @@
+import asyncio
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.cities import city_index
+from app.core.config import settings
+from app.core.text import normalize_search_text
+from app.database import SessionLocal
+from app.models.listing import Listing, ListingStatus
+
+logger = logging.getLogger("kitchentech")
+
+# Segment keys, most specific first. A suggestion uses the first level whose
+# segment has at least MIN_SEGMENT_SIZE comparables.
+SEGMENT_LEVELS: Tuple[Tuple[str, ...], ...] = (
+    ("city", "type", "material", "size"),
+    ("city", "type", "material"),
+    ("city", "type"),
+    ("type", "material", "size"),
+    ("type", "material"),
+    ("type",),
+    ("city",),
+    (),
+)
+
+MIN_SEGMENT_SIZE = 5
+
+# Upper bounds (meters, exclusive) of the kitchen length buckets
+SIZE_BUCKET_BOUNDS = (3.0, 5.0, 8.0)
+
+PERCENTILES = (0.10, 0.25, 0.50, 0.75, 0.90)
+
+
+class SegmentStats(NamedTuple):
+    count: int
+    p10: float
+    p25: float
+    p50: float
+    p75: float
+    p90: float
+
+
+class PriceSuggestion(NamedTuple):
+    price: float
+    low: float
+    high: float
+    segment: Dict[str, str]  # Attributes the comparables share, e.g. {"city": "riyadh", "type": "new"}
+    stats: SegmentStats
+    confidence: float  # 0..1
+    confidence_label: str  # high / medium / low
+
+
+def _key(value: Optional[str]) -> str:
+    return normalize_search_text(value) if value else ""
+
+
+def _city_key(city_id: Optional[int], city: Optional[str]) -> str:
+    """Canonical slug when the city is known, normalized free text otherwise."""
+    entry = city_index.get(city_id) if city_id is not None else None
+    return entry.slug if entry else _key(city)
+
+
+def _size_bucket(length_m: Optional[float]) -> str:
+    if not length_m or length_m <= 0:
+        return ""
+    for index, bound in enumerate(SIZE_BUCKET_BOUNDS):
+        if length_m < bound:
+            return str(index)
+    return str(len(SIZE_BUCKET_BOUNDS))
+
+
+def grouped_percentiles(codes: np.ndarray, values: np.ndarray, groups: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Counts and PERCENTILES of `values` per group code (0..groups-1), fully vectorized.
+
+    Values are sorted once by (group, value); each percentile is then a linear
+    interpolation between two positions inside its group's slice, like numpy's
+    default "linear" method.
+    """
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    quantiles = np.asarray(PERCENTILES)
+    positions = starts[:, None] + quantiles[None, :] * np.maximum(counts - 1, 0)[:, None]
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, (starts + counts - 1)[:, None])
+    fraction = positions - lower
+    return counts, sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+
+
+class PriceComparables:
+    """
+    In-memory price distributions of approved listings per market segment.
+
+    refresh() rebuilds every segment of every level in one pass over the listings;
+    suggest() is a handful of dict lookups. The state is swapped in a single
+    assignment so readers never see a half-built table.
+    """
+
+    def __init__(self):
+        self._state: Tuple[Dict[Tuple[str, ...], Dict[Tuple[str, ...], SegmentStats]], int] = ({}, 0)
+
+    @property
+    def listings_count(self) -> int:
+        return self._state[1]
+
+    def segments_count(self) -> int:
+        return sum(len(segments) for segments in self._state[0].values())
+
+    def refresh(self, db: Session) -> None:
+        rows = db.query(
+            Listing.price, Listing.city_id, Listing.city, Listing.type, Listing.material, Listing.length_m
+        ).filter(
+            Listing.status == ListingStatus.APPROVED,
+            Listing.price > 0
+        ).all()
+
+        prices = np.array([row[0] for row in rows], dtype=np.float64)
+        attributes = {
+            "city": [_city_key(row[1], row[2]) for row in rows],
+            "type": [_key(row[3]) for row in rows],
+            "material": [_key(row[4]) for row in rows],
+            "size": [_size_bucket(row[5]) for row in rows],
+        }
+
+        levels = {}
+        for level in SEGMENT_LEVELS:
+            keys = list(zip(*[attributes[name] for name in level])) if level else [()] * len(rows)
+            code_of: Dict[Tuple[str, ...], int] = {}
+            codes = np.fromiter((code_of.setdefault(key, len(code_of)) for key in keys), dtype=np.int64, count=len(keys))
+            if not code_of:
+                levels[level] = {}
+                continue
+            counts, percentiles = grouped_percentiles(codes, prices, len(code_of))
+            levels[level] = {
+                key: SegmentStats(int(counts[code]), *[round(float(value), 2) for value in percentiles[code]])
+                for key, code in code_of.items()
+                # Segments missing an attribute are not comparable on it
+                if all(key)
+            }
+
+        self._state = (levels, len(rows))
+        logger.info(f"💰 Price comparables refreshed: {len(rows)} listings, {self.segments_count()} segments")
+
+    def suggest(
+        self,
+        city: Optional[str],
+        type: Optional[str],
+        material: Optional[str] = None,
+        length_m: Optional[float] = None
+    ) -> Optional[PriceSuggestion]:
+        """Suggest a price from the most specific segment with enough comparables."""
+        levels, _ = self._state
+        wanted = {
+            "city": _city_key(city_index.resolve(city), city),
+            "type": _key(type),
+            "material": _key(material),
+            "size": _size_bucket(length_m),
+        }
+
+        for depth, level in enumerate(SEGMENT_LEVELS):
+            key = tuple(wanted[name] for name in level)
+            if not all(key):
+                continue
+            stats = levels.get(level, {}).get(key)
+            if stats is None or stats.count < MIN_SEGMENT_SIZE:
+                continue
+
+            # More comparables, a tighter spread and a more specific segment all add confidence
+            spread = (stats.p75 - stats.p25) / stats.p50 if stats.p50 else 1.0
+            specificity = 1 - depth / len(SEGMENT_LEVELS)
+            confidence = round(min(1.0, stats.count / 30) * (1 - min(spread, 1.0) / 2) * (0.5 + specificity / 2), 2)
+            label = "high" if confidence >= 0.6 else "medium" if confidence >= 0.3 else "low"
+
+            return PriceSuggestion(
+                price=stats.p50,
+                low=stats.p25,
+                high=stats.p75,
+                segment=dict(zip(level, key)),
+                stats=stats,
+                confidence=confidence,
+                confidence_label=label
+            )
+        return None
+
+
+price_comparables = PriceComparables()
+
+
+def refresh_price_comparables() -> None:
+    db = SessionLocal()
+    try:
+        price_comparables.refresh(db)
+    finally:
+        db.close()
+
+
+async def run_price_comparables_refresher() -> None:
+    """Refresh the comparables now and then every PRICE_COMPARABLES_REFRESH_SECONDS."""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_price_comparables)
+        except Exception as e:
+            logger.warning(f"⚠️  Price comparables refresh failed: {e}")
+        await asyncio.sleep(settings.PRICE_COMPARABLES_REFRESH_SECONDS)
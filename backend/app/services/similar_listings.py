@@ -0,0 +1,246 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import func, insert, or_
+from sqlalchemy.orm import Session
+from app.core.text import normalize_search_text
+from app.models.listing import Listing, ListingStatus
+from app.models.listing_similar import ListingSimilar
+
+logger = logging.getLogger("kitchentech")
+
+# Neighbours stored per listing
+SIMILAR_TOP_K = 12
+
+# Relative weight of each feature group in the cosine similarity
+FEATURE_WEIGHTS = {
+    "type": 1.0,
+    "material": 1.0,
+    "city": 1.0,
+    "price": 1.5,
+    "size": 0.5,
+}
+
+# Cap on the score matrix computed at once (rows x listings float32 values)
+BLOCK_VALUES = 1 << 24
+
+# Above this share of changed listings an incremental rebuild is not worth it
+FULL_REBUILD_RATIO = 0.25
+
+
+class ListingFeatures(NamedTuple):
+    ids: np.ndarray  # Listing ids, ascending
+    vectors: np.ndarray  # One unit-length float32 row per listing
+    updated_at: List[Optional[datetime]]
+
+
+def _category_key(value: Optional[str]) -> str:
+    return normalize_search_text(value) if value else ""
+
+
+def _one_hot(values: Sequence[str], weight: float) -> np.ndarray:
+    """One column per distinct non-empty value; empty values get an all-zero row."""
+    categories, inverse = np.unique(np.asarray(values, dtype=object), return_inverse=True)
+    block = np.zeros((len(values), len(categories)), dtype=np.float32)
+    block[np.arange(len(values)), inverse] = weight
+    if len(categories) and categories[0] == "":
+        block = block[:, 1:]
+    return block
+
+
+def _standardized(values: np.ndarray, weight: float) -> np.ndarray:
+    """Log-scale, center and scale a numeric column; missing values land on the mean."""
+    logged = np.log1p(np.where(values > 0, values, np.nan))
+    mean = np.nanmean(logged) if np.isfinite(logged).any() else 0.0
+    std = np.nanstd(logged) if np.isfinite(logged).any() else 0.0
+    scaled = (logged - mean) / (std if std > 0 else 1.0)
+    return (np.nan_to_num(scaled, nan=0.0) * weight).astype(np.float32).reshape(-1, 1)
+
+
+def load_listing_features(db: Session) -> ListingFeatures:
+    """Build the feature matrix of all approved listings."""
+    rows = db.query(
+        Listing.id, Listing.type, Listing.material, Listing.city_id, Listing.city,
+        Listing.price, Listing.length_m, Listing.width_m, Listing.height_m, Listing.updated_at
+    ).filter(
+        Listing.status == ListingStatus.APPROVED
+    ).order_by(Listing.id).all()
+    
+    if not rows:
+        return ListingFeatures(np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32), [])
+    
+    columns = list(zip(*rows))
+    numeric = np.array(columns[5:9], dtype=np.float64).T  # price, length, width, height; None -> nan
+    cities = [
+        f"id:{city_id}" if city_id is not None else f"text:{_category_key(city)}" if city else ""
+        for city_id, city in zip(columns[3], columns[4])
+    ]
+    
+    vectors = np.hstack([
+        _one_hot([_category_key(value) for value in columns[1]], FEATURE_WEIGHTS["type"]),
+        _one_hot([_category_key(value) for value in columns[2]], FEATURE_WEIGHTS["material"]),
+        _one_hot(cities, FEATURE_WEIGHTS["city"]),
+        _standardized(numeric[:, 0], FEATURE_WEIGHTS["price"]),
+        *[_standardized(numeric[:, index], FEATURE_WEIGHTS["size"]) for index in (1, 2, 3)],
+    ])
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms > 0, norms, 1.0)
+    
+    return ListingFeatures(np.array(columns[0], dtype=np.int64), vectors, list(columns[9]))
+
+
+def top_k_neighbours(
+    vectors: np.ndarray,
+    rows: np.ndarray,
+    k: int
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Yield (row, neighbour rows, scores) for each of `rows`, best first.
+    
+    Scores are computed as one matrix product per block of rows, sized so a block
+    never holds more than BLOCK_VALUES scores.
+    """
+    count = len(vectors)
+    k = min(k, count - 1)
+    if k <= 0:
+        return
+    block_size = max(1, BLOCK_VALUES // count)
+    
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        scores = vectors[block] @ vectors.T
+        scores[np.arange(len(block)), block] = -np.inf  # A listing is not its own neighbour
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        neighbours = np.take_along_axis(candidates, order, axis=1)
+        neighbour_scores = np.take_along_axis(candidate_scores, order, axis=1)
+        for offset, row in enumerate(block):
+            yield int(row), neighbours[offset], neighbour_scores[offset]
+
+
+def _incremental_targets(
+    db: Session,
+    features: ListingFeatures,
+    last_run: datetime,
+    k: int
+) -> Optional[np.ndarray]:
+    """
+    Rows whose neighbour lists may differ from the stored ones, or None if a full
+    rebuild is cheaper.
+    
+    That is: listings changed since the last run, listings without stored
+    neighbours, listings whose stored neighbours changed or left the feed, and
+    listings that a changed listing would now enter the top K of.
+    """
+    count = len(features.ids)
+    changed = np.array([updated is None or updated >= last_run for updated in features.updated_at], dtype=bool)
+    if changed.sum() > count * FULL_REBUILD_RATIO:
+        return None
+    
+    # Per source: stored neighbour count and the score needed to enter its top K
+    stored = {
+        listing_id: (neighbours, lowest)
+        for listing_id, neighbours, lowest in db.query(
+            ListingSimilar.listing_id, func.count(ListingSimilar.rank), func.min(ListingSimilar.score)
+        ).group_by(ListingSimilar.listing_id)
+    }
+    
+    # Sources pointing at a neighbour that changed or is no longer approved
+    stale_sources = {
+        listing_id for (listing_id,) in db.query(ListingSimilar.listing_id).join(
+            Listing, Listing.id == ListingSimilar.similar_listing_id
+        ).filter(
+            or_(Listing.status != ListingStatus.APPROVED, Listing.updated_at >= last_run)
+        ).distinct()
+    }
+    
+    expected = min(k, count - 1)
+    entry_score = np.full(count, np.inf, dtype=np.float32)
+    for row, listing_id in enumerate(features.ids.tolist()):
+        neighbours, lowest = stored.get(listing_id, (0, None))
+        if neighbours < expected or listing_id in stale_sources:
+            changed[row] = True
+        else:
+            entry_score[row] = lowest
+    
+    changed_rows = np.flatnonzero(changed)
+    if len(changed_rows):
+        block_size = max(1, BLOCK_VALUES // count)
+        best_changed = np.full(count, -np.inf, dtype=np.float32)
+        for start in range(0, len(changed_rows), block_size):
+            block = changed_rows[start:start + block_size]
+            scores = features.vectors[block] @ features.vectors.T
+            scores[np.arange(len(block)), block] = -np.inf
+            best_changed = np.maximum(best_changed, scores.max(axis=0))
+        changed |= best_changed > entry_score
+    
+    return np.flatnonzero(changed)
+
+
+def rebuild_similar_listings(db: Session, full: bool = False, k: int = SIMILAR_TOP_K) -> Dict[str, int]:
+    """
+    Recompute the listing_similar table.
+    
+    Incremental by default: only listings affected by changes since the last run
+    (the newest computed_at) are recomputed. Feature scaling is derived from the
+    current set of listings, so run with full=True now and then to re-align
+    everything after the catalogue has drifted.
+    """
+    started_at = datetime.utcnow()
+    last_run = None if full else db.query(func.max(ListingSimilar.computed_at)).scalar()
+    features = load_listing_features(db)
+    count = len(features.ids)
+    
+    targets = None
+    if last_run is not None and count:
+        targets = _incremental_targets(db, features, last_run, k)
+    incremental = targets is not None
+    if targets is None:
+        targets = np.arange(count)
+    
+    # Listings that left the feed keep no neighbours
+    approved_ids = features.ids.tolist()
+    if incremental:
+        removed = db.query(ListingSimilar.listing_id).join(
+            Listing, Listing.id == ListingSimilar.listing_id
+        ).filter(Listing.status != ListingStatus.APPROVED).distinct().all()
+        removed_ids = [listing_id for (listing_id,) in removed]
+        target_ids = [approved_ids[row] for row in targets.tolist()]
+        for start in range(0, len(removed_ids) + len(target_ids), 1000):
+            chunk = (removed_ids + target_ids)[start:start + 1000]
+            db.query(ListingSimilar).filter(ListingSimilar.listing_id.in_(chunk)).delete(synchronize_session=False)
+    else:
+        db.query(ListingSimilar).delete(synchronize_session=False)
+    
+    batch = []
+    written = 0
+    for row, neighbours, scores in top_k_neighbours(features.vectors, targets, k):
+        listing_id = approved_ids[row]
+        batch.extend(
+            {
+                "listing_id": listing_id,
+                "rank": rank,
+                "similar_listing_id": approved_ids[neighbour],
+                "score": float(score),
+                "computed_at": started_at,
+            }
+            for rank, (neighbour, score) in enumerate(zip(neighbours.tolist(), scores.tolist()), start=1)
+        )
+        if len(batch) >= 5000:
+            db.execute(insert(ListingSimilar), batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(ListingSimilar), batch)
+        written += len(batch)
+    
+    db.commit()
+    
+    stats = {"listings": count, "recomputed": len(targets), "rows_written": written, "incremental": int(incremental)}
+    logger.info(
+        f"🧭 Similar listings {'incremental' if incremental else 'full'} rebuild: "
+        f"{len(targets)}/{count} listings recomputed, {written} rows"
+    )
+    return stats
@@ -0,0 +1,174 @@
+"""
+Serialization Benchmark
+
+Checks that the fast JSON path (row tuples + orjson, FAST_JSON_ENABLED) produces
+byte-for-byte the same JSON as the pydantic response models of the list endpoints,
+then times both paths on a page of listings.
+
+Needs no database: rows are built in memory.
+
+    python benchmark_serialization.py [rows] [repeat]
+"""
+
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core import serialization
+from app.models import Listing, ListingImage, ListingStatus, User, UserRole, UserStatus
+from app.models.listing_image import image_srcset
+from app.routes.listings import (
+    ListingResponse, LISTING_LIST_FIELDS, listing_list_adapter, listing_row_serializer, _listing_fieldset
+)
+from app.routes.admin import UserResponse, user_row_serializer
+from app.routes.favorites import FavoriteResponse, FavoriteListingResponse, favorite_listing_row_serializer
+from pydantic import TypeAdapter
+from typing import List
+
+
+def make_listings(count: int) -> List[Listing]:
+    """Listings covering the awkward cases: NULLs, integral floats, microseconds, Arabic, escapes."""
+    base = datetime(2025, 1, 1, 12, 30)
+    listings = []
+    for i in range(count):
+        listings.append(Listing(
+            id=i + 1,
+            title=f"مطبخ ألمنيوم {i} \"quoted\" \\ \n tab\t",
+            description=None if i % 3 == 0 else "Modern kitchen — 🍳 " * (i % 5),
+            price=5000 if i % 2 == 0 else 12345.67,
+            city="الرياض" if i % 2 else "Jeddah",
+            status=ListingStatus.APPROVED,
+            type=None if i % 4 == 0 else "modern",
+            material="wood",
+            length_m=3 if i % 2 else None,
+            width_m=2.5,
+            height_m=None,
+            latitude=24.7136 + i / 1000 if i % 2 else None,
+            longitude=46.6753 if i % 2 else None,
+            is_featured=i % 7 == 0,
+            featured_until=base + timedelta(days=30) if i % 7 == 0 else None,
+            cover_image_url=f"/media/listings/{i + 1}/cover.jpg" if i % 3 else None,
+            owner_id=i % 10 + 1,
+            created_at=base - timedelta(minutes=i, microseconds=i * 37),
+            updated_at=base.replace(tzinfo=timezone.utc) if i % 5 == 0 else base,
+        ))
+    return listings
+
+
+def as_row(entity, serializer, **overrides):
+    return tuple(overrides[name] if name in overrides else getattr(entity, name) for name in serializer.fields)
+
+
+def pydantic_listings(listings: List[Listing]) -> bytes:
+    return listing_list_adapter.dump_json(listing_list_adapter.validate_python(listings, from_attributes=True))
+
+
+def fast_listings(rows) -> bytes:
+    return serialization.dumps(listing_row_serializer.to_dicts(rows))
+
+
+def check_listings(listings: List[Listing]) -> None:
+    rows = [as_row(listing, listing_row_serializer) for listing in listings]
+    assert pydantic_listings(listings) == fast_listings(rows), "listing JSON differs"
+
+
+def check_listings_with_images(listings: List[Listing]) -> None:
+    fieldset = _listing_fieldset(LISTING_LIST_FIELDS, True)
+    for listing in listings:
+        listing.images = [
+            ListingImage(
+                id=listing.id * 10 + n, listing_id=listing.id, url=f"/media/listings/{listing.id}/{n}.jpg", filename="-",
+                width=None if n else 1600, height=None if n else 1200,
+                variants=None if n else [{"width": 320, "url": f"/media/listings/{listing.id}/{n}_320w.webp", "height": 240}],
+                blurhash=None if n else "LEHV6nWB2yk8pyo0adR*.7kCMdnj",
+                preview=None if n else "data:image/webp;base64,UklGRiQAAABXRUJQVlA4IBgAAAAwAQCdASoBAAEAAQAcJaQAA3AA/vuUAAA="
+            )
+            for n in range(listing.id % 3)
+        ]
+    expected = fieldset.list_adapter.dump_json(fieldset.list_adapter.validate_python(listings, from_attributes=True))
+
+    items = fieldset.row_serializer.to_dicts([as_row(listing, fieldset.row_serializer) for listing in listings])
+    for item, listing in zip(items, listings):
+        item["images"] = [
+            {
+                "id": image.id, "url": image.url, "srcset": image_srcset(image.url, image.width, image.height, image.variants),
+                "blurhash": image.blurhash, "preview": image.preview
+            }
+            for image in listing.images
+        ]
+    assert expected == serialization.dumps(items), "listing JSON with images differs"
+
+
+def check_users() -> None:
+    users = [
+        User(
+            id=i, email=f"user{i}@example.com", username=f"user{i}", full_name=None if i % 2 else "مستخدم",
+            phone=None, role=UserRole.ADVERTISER, status=UserStatus.ACTIVE, company_name=None,
+            city="Riyadh", is_verified=bool(i % 2), join_date=datetime(2025, 3, 1, 8, 0, 0, i)
+        )
+        for i in range(1, 50)
+    ]
+    expected = []
+    for user in users:
+        user_data = UserResponse.model_validate(user)
+        user_data.ads_count = user.id % 4
+        expected.append(user_data)
+    rows = [as_row(user, user_row_serializer, ads_count=user.id % 4) for user in users]
+    adapter = TypeAdapter(List[UserResponse])
+    assert adapter.dump_json(expected) == serialization.dumps(user_row_serializer.to_dicts(rows)), "user JSON differs"
+
+
+def check_favorites(listings: List[Listing]) -> None:
+    rows = [
+        (index, listing.id, *as_row(
+            listing, favorite_listing_row_serializer,
+            owner_name=None if index % 2 else "Owner", image_url=f"/media/listings/{listing.id}/a.jpg"
+        ))
+        for index, listing in enumerate(listings, start=1)
+    ]
+    expected = [
+        FavoriteResponse(
+            id=row[0],
+            listing_id=row[1],
+            listing=FavoriteListingResponse(**dict(zip(favorite_listing_row_serializer.fields, row[2:])))
+        )
+        for row in rows
+    ]
+    payload = [
+        {"id": row[0], "listing_id": row[1], "listing": favorite_listing_row_serializer.to_dict(row[2:])}
+        for row in rows
+    ]
+    adapter = TypeAdapter(List[FavoriteResponse])
+    assert adapter.dump_json(expected) == serialization.dumps(payload), "favorite JSON differs"
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    print("🔍 Checking schema equivalence...")
+    listings = make_listings(count)
+    check_listings(listings)
+    check_listings([])
+    check_listings_with_images(make_listings(count))
+    check_users()
+    check_favorites(listings)
+    print("✅ Fast path output is identical to the pydantic response models")
+
+    rows = [as_row(listing, listing_row_serializer) for listing in listings]
+    print(f"\n⏱️  Serializing {count} listings x {repeat}...")
+    pydantic_time = min(timeit.repeat(lambda: pydantic_listings(listings), number=repeat, repeat=3)) / repeat
+    fast_time = min(timeit.repeat(lambda: fast_listings(rows), number=repeat, repeat=3)) / repeat
+    print(f"   pydantic (ORM objects): {pydantic_time * 1e6:8.1f} µs/page")
+    print(f"   fast path (row tuples): {fast_time * 1e6:8.1f} µs/page")
+    print(f"   speedup: {pydantic_time / fast_time:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Build Image Variants
+
+Renders the WebP derivatives, perceptual hash and loading placeholders (see
+app/services/image_processing.py) of listing images uploaded before those
+existed, i.e. rows whose variants, dhash or blurhash are NULL, and records them. Works
+with any storage backend (STORAGE_BACKEND); remote originals are downloaded to
+the upload staging directory first. Safe to re-run; images whose file is
+missing or unreadable are reported and left as they are.
+
+    python build_image_variants.py
+"""
+
+import asyncio
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import or_
+from app.core.config import settings
+from app.core.storage import storage
+from app.database import SessionLocal
+from app.models.listing_image import ListingImage
+from app.models.media_blob import MediaBlob
+from app.services.image_processing import render_variants, ImageProcessingError
+from app.services.media_blobs import (
+    UPLOAD_STAGING_DIR, blob_needs_processing, set_blob_hashes, set_blob_variants, store_blob_variants,
+    blob_image_fields
+)
+
+BATCH_SIZE = 100
+
+
+def render(source: str, stem: str, output_dir: str):
+    try:
+        return render_variants(source, stem, output_dir), None
+    except ImageProcessingError as e:
+        return None, str(e)
+
+
+def image_key(image: ListingImage, blob) -> str:
+    return blob.path if blob is not None else f"listings/{image.listing_id}/{image.filename}"
+
+
+async def build(image: ListingImage, blob, pool: ProcessPoolExecutor, work_dir: Path):
+    """Render and store the derivatives of one image. Returns an error message or None."""
+    key = image_key(image, blob)
+    source = storage.local_path(key)
+    if source is None:
+        source = work_dir / key.rsplit("/", 1)[-1]
+        try:
+            await storage.download(key, source)
+        except Exception as e:
+            return f"cannot fetch {key}: {e}"
+
+    loop = asyncio.get_running_loop()
+    processed, error = await loop.run_in_executor(pool, render, str(source), Path(key).stem, str(work_dir))
+    if processed is None:
+        return error
+
+    # Derivatives that already exist are in use and stay as they are; only the
+    # columns added since are filled in
+    if blob is not None:
+        if blob.variants is None:
+            set_blob_variants(blob, processed)
+            await store_blob_variants(blob, work_dir)
+        else:
+            set_blob_hashes(blob, processed)
+        for field, value in blob_image_fields(blob).items():
+            setattr(image, field, value)
+        return None
+
+    image.dhash = processed.dhash
+    image.blurhash = processed.blurhash
+    image.preview = processed.preview
+    if image.variants is not None:
+        return None
+    directory = key.rsplit("/", 1)[0]
+    variants = []
+    for variant in processed.variants:
+        variant_key = f"{directory}/{variant['filename']}"
+        await storage.save(variant_key, work_dir / variant["filename"])
+        variants.append({"url": storage.url(variant_key), "width": variant["width"], "height": variant["height"]})
+    image.width = processed.width
+    image.height = processed.height
+    image.variants = variants
+    return None
+
+
+async def main():
+    print("🖼️  Building image variants...")
+    db = SessionLocal()
+    done = failed = 0
+    last_id = 0
+    try:
+        with ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS) as pool:
+            while True:
+                images = db.query(ListingImage).filter(
+                    or_(
+                        ListingImage.variants.is_(None), ListingImage.dhash.is_(None), ListingImage.blurhash.is_(None)
+                    ),
+                    ListingImage.id > last_id
+                ).order_by(ListingImage.id).limit(BATCH_SIZE).all()
+                if not images:
+                    break
+                last_id = images[-1].id
+                blobs = {
+                    blob.sha256: blob for blob in db.query(MediaBlob).filter(
+                        MediaBlob.sha256.in_({image.blob_sha256 for image in images if image.blob_sha256})
+                    )
+                }
+
+                # One image per blob is rendered; the others copy the blob's fields
+                jobs = []
+                copies = []
+                rendering = set()
+                for image in images:
+                    blob = blobs.get(image.blob_sha256)
+                    if blob is not None and (not blob_needs_processing(blob) or blob.sha256 in rendering):
+                        copies.append((image, blob))
+                        continue
+                    if blob is not None:
+                        rendering.add(blob.sha256)
+                    jobs.append((image, blob))
+
+                with tempfile.TemporaryDirectory(dir=UPLOAD_STAGING_DIR) as temp_dir:
+                    work_dirs = [Path(temp_dir) / str(image.id) for image, _ in jobs]
+                    for work_dir in work_dirs:
+                        work_dir.mkdir()
+                    errors = await asyncio.gather(*(
+                        build(image, blob, pool, work_dir) for (image, blob), work_dir in zip(jobs, work_dirs)
+                    ))
+                for (image, _), error in zip(jobs, errors):
+                    if error is not None:
+                        failed += 1
+                        print(f"⚠️  Image {image.id} ({image.url}): {error}")
+                    else:
+                        done += 1
+
+                for image, blob in copies:
+                    if blob_needs_processing(blob):
+                        continue  # Its render failed and was reported above
+                    for field, value in blob_image_fields(blob).items():
+                        setattr(image, field, value)
+                    done += 1
+                db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error building image variants: {e}")
+        return 1
+    finally:
+        db.close()
+        await storage.close()
+
+    print(f"✅ {done} images processed, {failed} skipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
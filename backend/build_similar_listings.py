@@ -0,0 +1,43 @@
+"""
+Build Similar Listings
+
+Recomputes the precomputed "similar kitchens" of every approved listing
+(listing_similar table) used by GET /api/v1/listings/{id}/similar.
+
+Incremental by default: only listings affected by changes since the previous
+run are recomputed. Pass --full to rebuild everything. Meant to run from cron,
+e.g. every 15 minutes, with a nightly --full run.
+
+    python build_similar_listings.py [--full]
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from app.database import SessionLocal
+from app.services.similar_listings import rebuild_similar_listings
+
+
+def main():
+    full = "--full" in sys.argv[1:]
+    print(f"🧭 Building similar listings ({'full' if full else 'incremental'})...")
+    db = SessionLocal()
+    try:
+        stats = rebuild_similar_listings(db, full=full)
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error building similar listings: {e}")
+        return 1
+    finally:
+        db.close()
+    
+    print(f"✅ {stats['recomputed']} of {stats['listings']} listings recomputed, {stats['rows_written']} rows written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
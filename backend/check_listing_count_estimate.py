@@ -0,0 +1,80 @@
+"""
+Listing Count Estimate Check
+
+Seeds the listings table with synthetic rows (100,000 by default) inside a
+transaction and asks for the X-Total-Count of GET /api/v1/listings/?with_total=true
+for a broad and a narrow filter set. The broad one must come from the planner
+estimate (and land near the real count), the narrow one from an exact COUNT.
+The transaction is rolled back at the end, so nothing is left behind.
+
+Requires PostgreSQL with migrations applied (alembic upgrade head).
+
+    python check_listing_count_estimate.py [rows]
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import func
+from app.database import SessionLocal
+from app.core.config import settings
+from app.routes.listings import _listing_filters, _apply_listing_filters, _listing_total, listing_count_cache
+from app.models.listing import Listing
+from check_listing_sort_plans import seed
+
+
+def check_total(db, label, filters, expected_mode) -> bool:
+    listing_count_cache.clear()
+    total, mode = _listing_total(db, filters)
+    exact = _apply_listing_filters(db.query(func.count(Listing.id)), filters).scalar()
+
+    ok = mode == expected_mode
+    if mode == "estimate":
+        # Planner estimates are rough, but should be in the right ballpark
+        ok = ok and 0.5 * exact <= total <= 2 * exact
+    else:
+        ok = ok and total == exact
+
+    print(f"{'✅' if ok else '❌'} {label}: {total:,} ({mode}, expected {expected_mode}; exact count {exact:,})")
+    return ok
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    threshold = settings.LISTING_COUNT_EXACT_THRESHOLD
+    if rows < 2 * threshold:
+        print(f"❌ Seed at least {2 * threshold:,} rows (LISTING_COUNT_EXACT_THRESHOLD is {threshold:,})")
+        return 1
+
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "postgresql":
+            print("❌ This check needs PostgreSQL")
+            return 1
+
+        print(f"🌱 Seeding {rows:,} listings (rolled back afterwards)...")
+        seed(db, rows)
+
+        broad = _listing_filters(None, None, None, None, None, None, None, None, 25, None)
+        narrow = _listing_filters(None, None, None, "wood", None, 2000, None, None, 25, None)
+        results = [
+            check_total(db, "all approved listings", broad, "estimate"),
+            check_total(db, "wood, price <= 2000", narrow, "exact"),
+        ]
+    finally:
+        db.rollback()
+        db.close()
+
+    if not all(results):
+        print("\n❌ Listing totals are not taken the expected way")
+        return 1
+    print("\n✅ Listing totals are estimated above the threshold and counted below it")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())